@@ -0,0 +1,41 @@
+"""
+Throughput of hash_event_params against hash_event_param in a loop, for building a get_logs topic filter
+over validator pubkeys: distinct pubkeys, then the same pubkeys again as when a filter is rebuilt.
+
+    make install && python scripts/benchmark_hash_event_param.py
+"""
+
+import os
+import timeit
+
+from web3_utils.hash_event_param import _hash_event_param_cached, hash_event_param, hash_event_params
+
+PUBKEYS = 10_000
+
+
+def main():
+    pubkeys = ["0x" + os.urandom(48).hex() for _ in range(PUBKEYS)]
+    raw_pubkeys = [bytes.fromhex(pubkey[2:]) for pubkey in pubkeys]
+
+    def cold(params):
+        def run():
+            _hash_event_param_cached.cache_clear()
+            hash_event_params(params)
+
+        return run
+
+    hash_event_params(pubkeys)
+    cases = {
+        "hash_event_param": lambda: [hash_event_param(pubkey) for pubkey in pubkeys],
+        "batch, no memo": lambda: hash_event_params(pubkeys, memoize=False),
+        "batch, cold memo": cold(pubkeys),
+        "batch, raw bytes": lambda: hash_event_params(raw_pubkeys, memoize=False),
+        "batch, warm memo": lambda: hash_event_params(pubkeys),
+    }
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=1, repeat=3))
+        print(f"{name:20} {PUBKEYS / seconds:12,.0f} params/s")
+
+
+if __name__ == "__main__":
+    main()
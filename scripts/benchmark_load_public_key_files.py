@@ -0,0 +1,36 @@
+"""
+Time to load a directory of key files with load_public_key_files sequentially, with threads and with processes.
+Defaults to 40 files of 25k keys, pass a file count and a key count per file to change it.
+
+    make install && python scripts/benchmark_load_public_key_files.py [files] [keys_per_file]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+from web3_utils.load_public_keys_from_files import load_public_key_files
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    keys_per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 25_000
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        for i in range(files):
+            with open(os.path.join(dir_path, f"bulk1-node{i}-pubkeys.txt"), "w") as f:
+                f.writelines(f"0x{os.urandom(48).hex()}\n" for _ in range(keys_per_file))
+
+        cases = {
+            "sequential": {},
+            "threads": {"parallel": True},
+            "processes": {"parallel": True, "use_processes": True},
+        }
+        for name, kwargs in cases.items():
+            seconds = min(timeit.repeat(lambda: load_public_key_files("bulk1", dir_path, **kwargs), number=1, repeat=3))
+            print(f"{name:12} {seconds:8.3f} s for {files * keys_per_file:,} keys")
+
+
+if __name__ == "__main__":
+    main()
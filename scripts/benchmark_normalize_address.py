@@ -0,0 +1,43 @@
+"""
+Throughput of normalize_addresses against normalize_address in a loop, over log-like input where
+a small set of addresses repeats, over distinct addresses and over raw 20-byte addresses.
+
+    make install && python scripts/benchmark_normalize_address.py
+"""
+
+import os
+import random
+import timeit
+
+from web3_utils.normalize_address import _normalize_address, normalize_address, normalize_addresses
+
+ADDRESSES = 100_000
+DISTINCT_ADDRESSES = 1_000
+
+
+def main():
+    distinct = ["0x" + os.urandom(20).hex() for _ in range(ADDRESSES)]
+    repeated = random.choices(distinct[:DISTINCT_ADDRESSES], k=ADDRESSES)
+    raw = [bytes.fromhex(address[2:]) for address in distinct]
+
+    def batch(addresses):
+        def run():
+            _normalize_address.cache_clear()
+            normalize_addresses(addresses)
+
+        return run
+
+    cases = {
+        "loop, repeated": lambda: [normalize_address(address) for address in repeated],
+        "batch, repeated": batch(repeated),
+        "loop, distinct": lambda: [normalize_address(address) for address in distinct],
+        "batch, distinct": batch(distinct),
+        "batch, raw bytes": batch(raw),
+    }
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=1, repeat=3))
+        print(f"{name:20} {ADDRESSES / seconds:12,.0f} addresses/s")
+
+
+if __name__ == "__main__":
+    main()
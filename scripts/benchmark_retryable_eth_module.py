@@ -0,0 +1,69 @@
+"""
+Per-call overhead of the retryable Eth module against a bare Eth module, no RPC is sent.
+The "per-call decorator" row rebuilds the retry decorator on every call, like the module did before callers were cached.
+
+    make install && python scripts/benchmark_retryable_eth_module.py
+"""
+
+import logging
+import timeit
+from unittest.mock import patch
+
+from web3 import HTTPProvider, Web3
+from web3.eth import Eth
+from web3.main import get_default_modules
+
+from web3_utils.retry_policy import RetryPolicy
+from web3_utils.retryable_eth_module import (
+    before,
+    before_sleep_log,
+    get_retryable_eth_module,
+    is_provider_failure,
+    is_retryable_eth_error,
+    rpc_method_name,
+)
+
+CALLS = 100_000
+
+
+def stub_caller(method):
+    return lambda *args, **kwargs: None
+
+
+def build_web3(eth_module) -> Web3:
+    web3_modules = get_default_modules()
+    web3_modules["eth"] = eth_module
+    return Web3(HTTPProvider("http://127.0.0.1:8545"), modules=web3_modules)
+
+
+def main():
+    logger = logging.getLogger("benchmark")
+    retry_policy = RetryPolicy()
+
+    with patch("web3.module.retrieve_blocking_method_call_fn", return_value=stub_caller):
+        plain = build_web3(Eth)
+        retryable = build_web3(get_retryable_eth_module(Eth, logger, retry_policy=retry_policy))
+
+    def per_call_decorator():
+        method = Eth.__dict__["_chain_id"]
+        return retry_policy.retrying(
+            rpc_method_name(method),
+            is_retryable_eth_error,
+            is_failure=is_provider_failure,
+            reraise=True,
+            before=before,
+            before_sleep=before_sleep_log(logger=logger, log_level=logging.WARNING),
+        )(stub_caller(method))()
+
+    cases = {
+        "Eth": lambda: plain.eth._chain_id(),
+        "RetryableModule": lambda: retryable.eth._chain_id(),
+        "per-call decorator": per_call_decorator,
+    }
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=CALLS, repeat=5))
+        print(f"{name:20} {seconds / CALLS * 1e6:8.3f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,20 @@
+import asyncio
+import json
 import logging
+import struct
+from unittest.mock import Mock
 
 import pytest
+from aiohttp import ClientConnectionError, ClientResponseError, web
+from aiohttp.test_utils import TestServer
 from pytest_mock import MockerFixture
-from requests import HTTPError, ConnectionError, Response
 
 from web3_utils.async_beacon import AsyncBeacon
+from web3_utils.beacon_response_cache import BeaconResponseCache
+from web3_utils.beacon_ssz import PENDING_PARTIAL_WITHDRAWALS, PendingConsolidation, PendingPartialWithdrawal
+from web3_utils.rate_limiter import RateLimiter
+from web3_utils.retry_policy import RetryPolicy
+from web3_utils.single_flight import SingleFlight
 
 VALIDATOR_PUB_KEY_1 = "1" * 96
 
@@ -17,7 +27,7 @@ def isolation(fn_isolation):
 def trigger_fake_error(error_to_raise, stop_after_attempt=1):
     state = {"counter": 0}
 
-    def fun(*dargs):
+    def fun(*dargs, **dkwargs):
         if state["counter"] < stop_after_attempt:
             state["counter"] += 1
             raise error_to_raise
@@ -27,68 +37,63 @@ def trigger_fake_error(error_to_raise, stop_after_attempt=1):
     return fun
 
 
+def response_error(status: int) -> ClientResponseError:
+    return ClientResponseError(request_info=Mock(), history=(), status=status)
+
+
 @pytest.mark.asyncio()
 async def test_get_validator_not_found(mocker: MockerFixture):
-    class Resp:
-        status_code = 404
-
     mocked_fn = mocker.patch(
-        "web3.beacon.Beacon.get_validator", side_effect=trigger_fake_error(error_to_raise=HTTPError(response=Resp()))
+        "web3_utils.async_beacon.AsyncBeacon._request", side_effect=trigger_fake_error(error_to_raise=response_error(404))
     )
 
     async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), retry_stop=None)
 
     response = await async_beacon.get_validator("0x" + VALIDATOR_PUB_KEY_1)
     assert response is None
-    mocked_fn.assert_called_once_with("0x" + VALIDATOR_PUB_KEY_1, "head")
+    mocked_fn.assert_called_once_with("GET", f"/eth/v1/beacon/states/head/validators/0x{VALIDATOR_PUB_KEY_1}", params=None)
 
 
 @pytest.mark.asyncio()
-async def test_run_as_async_retries(mocker: MockerFixture):
-    class Resp:
-        def __init__(self, code: int):
-            self.status_code = code
-
+async def test_request_retries(mocker: MockerFixture):
     for error_to_raise in [
-        HTTPError(response=Resp(502)),
-        HTTPError(response=Resp(429)),
-        HTTPError(response=Resp(503)),
-        HTTPError(response=Resp(500)),
-        ConnectionError("Oops"),
+        response_error(502),
+        response_error(429),
+        response_error(503),
+        response_error(500),
+        ClientConnectionError("Oops"),
     ]:
         mocker.patch(
-            "web3.beacon.Beacon.get_validator", side_effect=trigger_fake_error(error_to_raise=error_to_raise, stop_after_attempt=2)
+            "web3_utils.async_beacon.AsyncBeacon._request",
+            side_effect=trigger_fake_error(error_to_raise=error_to_raise, stop_after_attempt=2),
         )
         async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), retry_stop=None)
         retries, error = await async_beacon.get_validator("0x" + VALIDATOR_PUB_KEY_1)
         assert retries == 2
-        if isinstance(error, HTTPError):
-            assert error.response.status_code == error_to_raise.response.status_code
+        if isinstance(error, ClientResponseError):
+            assert error.status == error_to_raise.status
 
 
 @pytest.mark.asyncio()
 async def test_retry_stop_fn(mocker: MockerFixture):
-    class Resp:
-        def __init__(self, code: int):
-            self.status_code = code
-
     class StopOnShutdownFake:
         def __call__(self, retry_state: "RetryCallState") -> bool:
             return retry_state.attempt_number > 1
 
-    error_to_raise = HTTPError(response=Resp(502))
+    error_to_raise = response_error(502)
     mocker.patch(
-        "web3.beacon.Beacon.get_validator", side_effect=trigger_fake_error(error_to_raise=error_to_raise, stop_after_attempt=99)
+        "web3_utils.async_beacon.AsyncBeacon._request",
+        side_effect=trigger_fake_error(error_to_raise=error_to_raise, stop_after_attempt=99),
     )
     async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), retry_stop=StopOnShutdownFake)
 
-    with pytest.raises(Exception, match="HTTPError"):
+    with pytest.raises(Exception, match="ClientResponseError"):
         await async_beacon.get_validator("0x" + VALIDATOR_PUB_KEY_1)
 
 
 @pytest.mark.asyncio()
 async def test_cache_genesis_time(mocker: MockerFixture):
-    mocked_fn = mocker.patch("web3.beacon.Beacon.get_genesis", return_value={"data": {"genesis_time": "1606824000"}})
+    mocked_fn = mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", return_value={"data": {"genesis_time": "1606824000"}})
     async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), retry_stop=None)
 
     response = await async_beacon.get_genesis()
@@ -103,32 +108,22 @@ async def test_cache_genesis_time(mocker: MockerFixture):
 
 @pytest.mark.asyncio()
 async def test_get_validator_balances(mocker: MockerFixture):
-    # Mock the get_validator_balances method from web3.beacon.Beacon
     response_json = {"data": [{"index": "0", "balance": "32000000000"}, {"index": "1", "balance": "32000000000"}]}
-    mocked_response = Response()
-    mocked_response.json = lambda: response_json
-    mocked_response.status_code = 200
-
-    mocked_fn = mocker.patch("web3._utils.request.get_response_from_get_request", return_value=mocked_response)
+    mocked_fn = mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", return_value=response_json)
 
     async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), retry_stop=None)
 
     # Test with default parameters
     response = await async_beacon.get_validator_balances()
     assert response == response_json
-    mocked_fn.assert_called_with(
-        "http://127.0.0.1:8545/eth/v1/beacon/states/head/validator_balances", timeout=10.0, params={"id": None}
-    )
+    mocked_fn.assert_called_with("GET", "/eth/v1/beacon/states/head/validator_balances", params={"id": None})
 
     # Test with custom state_id and indexes
     indexes = ["0", "1"]
     state_id = "finalized"
     response = await async_beacon.get_validator_balances(state_id=state_id, indexes=indexes)
-    print("RESP", response)
     assert response == response_json
-    mocked_fn.assert_called_with(
-        f"http://127.0.0.1:8545/eth/v1/beacon/states/{state_id}/validator_balances", timeout=10.0, params={"id": ["0", "1"]}
-    )
+    mocked_fn.assert_called_with("GET", f"/eth/v1/beacon/states/{state_id}/validator_balances", params={"id": ["0", "1"]})
 
 
 @pytest.mark.asyncio()
@@ -161,3 +156,289 @@ async def test_get_pending_partial_withdrawals(mocker: MockerFixture):
     response = await async_beacon.get_pending_partial_withdrawals()
     assert response == response_json
     mocked_response.assert_called_once_with("head")
+
+
+@pytest.mark.asyncio()
+async def test_native_transport_reuses_session():
+    async def validator_balances(request: web.Request):
+        return web.json_response({"data": [{"index": i, "balance": "1"} for i in request.query.getall("id", [])]})
+
+    async def validators(request: web.Request):
+        body = await request.json()
+        return web.json_response({"data": [{"index": i} for i in body["ids"]]})
+
+    app = web.Application()
+    app.router.add_get("/eth/v1/beacon/states/{state_id}/validator_balances", validator_balances)
+    app.router.add_post("/eth/v1/beacon/states/{state_id}/validators", validators)
+
+    async with TestServer(app) as server:
+        async with AsyncBeacon(str(server.make_url("")), logger=logging.getLogger(), connection_limit=2) as async_beacon:
+            balances = await async_beacon.get_validator_balances(indexes=["1", "2"])
+            session = async_beacon._session
+            validators_response = await async_beacon.get_validators(ids=["3"])
+
+            assert balances == {"data": [{"index": "1", "balance": "1"}, {"index": "2", "balance": "1"}]}
+            assert validators_response == {"data": [{"index": "3"}]}
+            assert async_beacon._session is session
+            assert session.connector.limit == 2
+
+        assert session.closed
+
+
+@pytest.mark.asyncio()
+async def test_get_validators_in_batches(mocker: MockerFixture):
+    ids = [str(i) for i in range(10)]
+
+    async def post_request(method, endpoint, json_data=None):
+        return {"execution_optimistic": False, "finalized": True, "data": [{"index": i} for i in json_data["ids"]]}
+
+    mocked_fn = mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", side_effect=post_request)
+    async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), max_concurrent_batches=2)
+
+    response = await async_beacon.get_validators(state_id="finalized", ids=ids, statuses=["active_ongoing"], batch_size=4)
+
+    assert response == {"execution_optimistic": False, "finalized": True, "data": [{"index": i} for i in ids]}
+    assert mocked_fn.call_count == 3
+    mocked_fn.assert_any_call(
+        "POST", "/eth/v1/beacon/states/finalized/validators", json_data={"ids": ids[8:], "statuses": ["active_ongoing"]}
+    )
+
+
+@pytest.mark.asyncio()
+async def test_get_validator_balances_in_batches_retries_only_failed_chunk(mocker: MockerFixture):
+    indexes = [str(i) for i in range(6)]
+    failed = {"counter": 0}
+
+    async def get_request(method, endpoint, params=None):
+        if params["id"] == indexes[2:4] and failed["counter"] == 0:
+            failed["counter"] += 1
+            raise response_error(503)
+        return {"execution_optimistic": False, "data": [{"index": i, "balance": "1"} for i in params["id"]]}
+
+    mocked_fn = mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", side_effect=get_request)
+    async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger())
+
+    response = await async_beacon.get_validator_balances(state_id="123", indexes=indexes, batch_size=2)
+
+    assert [item["index"] for item in response["data"]] == indexes
+    assert mocked_fn.call_count == 4
+
+
+@pytest.mark.asyncio()
+async def test_failed_chunk_cancels_the_other_chunks(mocker: MockerFixture):
+    ids = [str(i) for i in range(10)]
+    started, cancelled = [], []
+
+    async def post_request(method, endpoint, json_data=None):
+        chunk = json_data["ids"]
+        started.append(chunk)
+        if chunk == ids[:2]:
+            await asyncio.sleep(0.01)
+            raise response_error(400)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(chunk)
+            raise
+        return {"data": [{"index": i} for i in chunk]}
+
+    mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", side_effect=post_request)
+    async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), max_concurrent_batches=3)
+
+    with pytest.raises(ClientResponseError) as error:
+        await asyncio.wait_for(async_beacon.get_validators(state_id="finalized", ids=ids, batch_size=2), timeout=5)
+
+    assert error.value.status == 400
+    # the chunks holding a semaphore slot, including the one taking the failed chunk's slot, were cancelled
+    # and the chunk still waiting for a slot never started
+    assert started == [ids[0:2], ids[2:4], ids[4:6], ids[6:8]]
+    assert cancelled == [ids[2:4], ids[4:6], ids[6:8]]
+
+
+@pytest.mark.asyncio()
+async def test_slow_but_steady_response_does_not_time_out():
+    async def validators(request: web.Request):
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        await response.write(b'{"data":[')
+        for index in range(8):
+            await asyncio.sleep(0.1)
+            await response.write((b"," if index else b"") + json.dumps({"index": str(index)}).encode())
+        await response.write(b"]}")
+        return response
+
+    async def stalled(request: web.Request):
+        await asyncio.sleep(1)
+        return web.json_response({"data": []})
+
+    app = web.Application()
+    app.router.add_post("/eth/v1/beacon/states/{state_id}/validators", validators)
+    app.router.add_get("/eth/v1/beacon/states/{state_id}/validator_balances", stalled)
+
+    async with TestServer(app) as server:
+        async with AsyncBeacon(
+            str(server.make_url("")),
+            logger=logging.getLogger(),
+            request_timeout=0.3,
+            retry_policy=RetryPolicy(max_attempts=1),
+        ) as async_beacon:
+            # 0.8s in total, but never more than 0.1s between reads
+            response = await async_beacon.get_validators("head", ids=[str(index) for index in range(8)])
+            assert [validator["index"] for validator in response["data"]] == [str(index) for index in range(8)]
+
+            # a read stalled for longer than request_timeout still fails
+            with pytest.raises(Exception, match="TimeoutError"):
+                await async_beacon.get_validator_balances("head", indexes=["1"])
+
+
+@pytest.mark.asyncio()
+async def test_iter_validators():
+    async def validators(request: web.Request):
+        body = await request.json()
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        await response.write(b'{"execution_optimistic":false,"finalized":true,"data":[')
+        for position, index in enumerate(body["ids"]):
+            separator = b"," if position else b""
+            await response.write(separator + json.dumps({"index": index, "status": "active_ongoing"}).encode())
+        await response.write(b"]}")
+        return response
+
+    app = web.Application()
+    app.router.add_post("/eth/v1/beacon/states/{state_id}/validators", validators)
+
+    async with TestServer(app) as server:
+        async with AsyncBeacon(str(server.make_url("")), logger=logging.getLogger()) as async_beacon:
+            ids = [str(i) for i in range(1000)]
+            indexes = [validator["index"] async for validator in async_beacon.iter_validators("finalized", ids=ids)]
+
+    assert indexes == ids
+
+
+@pytest.mark.asyncio()
+async def test_ssz_responses_with_json_fallback():
+    consolidations_fixture = struct.pack("<QQQQ", 1, 2, 3, 4)
+    accept_headers = []
+
+    async def pending_consolidations(request: web.Request):
+        accept_headers.append(request.headers["Accept"])
+        return web.Response(
+            body=consolidations_fixture,
+            content_type="application/octet-stream",
+            headers={"Eth-Consensus-Version": "electra", "Eth-Execution-Optimistic": "false", "Eth-Consensus-Finalized": "true"},
+        )
+
+    async def pending_partial_withdrawals(request: web.Request):
+        if "application/octet-stream" in request.headers.get("Accept", ""):
+            return web.Response(status=406)
+        return web.json_response(
+            {
+                "version": "electra",
+                "execution_optimistic": False,
+                "finalized": True,
+                "data": [{"validator_index": "7", "amount": "1000000000", "withdrawable_epoch": "300"}],
+            }
+        )
+
+    app = web.Application()
+    app.router.add_get("/eth/v1/beacon/states/{state_id}/pending_consolidations", pending_consolidations)
+    app.router.add_get("/eth/v1/beacon/states/{state_id}/pending_partial_withdrawals", pending_partial_withdrawals)
+
+    async with TestServer(app) as server:
+        async with AsyncBeacon(str(server.make_url("")), logger=logging.getLogger(), ssz=True) as async_beacon:
+            consolidations = await async_beacon.get_pending_consolidations("finalized")
+            withdrawals = await async_beacon.get_pending_partial_withdrawals()
+            withdrawals_again = await async_beacon.get_pending_partial_withdrawals()
+
+    assert accept_headers[0].startswith("application/octet-stream")
+    assert consolidations == {
+        "version": "electra",
+        "execution_optimistic": False,
+        "finalized": True,
+        "data": [PendingConsolidation(1, 2), PendingConsolidation(3, 4)],
+    }
+    assert withdrawals["data"] == [PendingPartialWithdrawal(7, 1000000000, 300)]
+    assert withdrawals_again == withdrawals
+    assert async_beacon._ssz_unsupported == {(async_beacon.base_url, PENDING_PARTIAL_WITHDRAWALS)}
+
+
+@pytest.mark.asyncio()
+async def test_response_cache(mocker: MockerFixture):
+    response_json = {"data": {"index": "1"}}
+    mocked_fn = mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", return_value=response_json)
+    response_cache = BeaconResponseCache()
+    async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), response_cache=response_cache)
+
+    for _ in range(3):
+        assert await async_beacon.get_validator("0x" + VALIDATOR_PUB_KEY_1, "123") == response_json
+        await async_beacon.get_syncing()
+
+    assert mocked_fn.call_count == 4
+    assert response_cache.hits == 2
+
+
+@pytest.mark.asyncio()
+async def test_single_flight(mocker: MockerFixture):
+    async def get_request(method, endpoint, params=None):
+        await asyncio.sleep(0.01)
+        return {"data": {"finalized": {"epoch": "10"}}}
+
+    mocked_fn = mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", side_effect=get_request)
+    single_flight = SingleFlight()
+    async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), single_flight=single_flight)
+
+    results = await asyncio.gather(*[async_beacon.get_finality_checkpoint() for _ in range(100)])
+    await async_beacon.get_finality_checkpoint()
+
+    assert all(result == {"data": {"finalized": {"epoch": "10"}}} for result in results)
+    assert mocked_fn.call_count == 2
+    assert single_flight.deduplicated == 99
+
+
+@pytest.mark.asyncio()
+async def test_retry_policy(mocker: MockerFixture):
+    rate_limited = ClientResponseError(request_info=Mock(), history=(), status=429, headers={"Retry-After": "0"})
+    mocked_fn = mocker.patch(
+        "web3_utils.async_beacon.AsyncBeacon._request",
+        side_effect=trigger_fake_error(error_to_raise=rate_limited, stop_after_attempt=99),
+    )
+    async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), retry_policy=RetryPolicy(max_attempts=3))
+
+    with pytest.raises(Exception, match="ClientResponseError"):
+        await async_beacon.get_validator("0x" + VALIDATOR_PUB_KEY_1)
+
+    assert mocked_fn.call_count == 3
+
+
+@pytest.mark.asyncio()
+async def test_retrying_is_built_once_per_endpoint(mocker: MockerFixture):
+    mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", return_value={"data": {"index": "1"}})
+    retry_policy = RetryPolicy()
+    retrying = mocker.spy(retry_policy, "retrying")
+    async_beacon = AsyncBeacon("http://127.0.0.1:8545", logger=logging.getLogger(), retry_policy=retry_policy)
+
+    for pubkey in (VALIDATOR_PUB_KEY_1, "2" * 96, VALIDATOR_PUB_KEY_1):
+        await async_beacon.get_validator("0x" + pubkey)
+    await async_beacon.get_validator("0x" + VALIDATOR_PUB_KEY_1, state_id="finalized")
+    assert retrying.call_count == 1
+
+    await async_beacon.get_syncing()
+    assert retrying.call_count == 2
+
+
+@pytest.mark.asyncio()
+async def test_rate_limiter():
+    async def syncing(request: web.Request):
+        return web.json_response({"data": {"is_syncing": False}})
+
+    app = web.Application()
+    app.router.add_get("/eth/v1/node/syncing", syncing)
+
+    async with TestServer(app) as server:
+        rate_limiter = RateLimiter(rate=1, burst=3)
+        async with AsyncBeacon(str(server.make_url("")), logger=logging.getLogger(), rate_limiter=rate_limiter) as async_beacon:
+            for _ in range(3):
+                await async_beacon.get_syncing()
+
+        # the requests used up the burst of the server's host
+        assert rate_limiter.reserve(f"{server.host}:{server.port}") > 0.9
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import struct
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from web3_utils.async_beacon_pool import AsyncBeaconPool
+from web3_utils.beacon_ssz import PENDING_PARTIAL_WITHDRAWALS, PendingPartialWithdrawal
+
+
+def beacon_node_app(name: str, delay: float = 0.0, status: int = 200, is_syncing: bool = False):
+    requests = []
+
+    async def finality_checkpoints(request: web.Request):
+        requests.append(request.path)
+        await asyncio.sleep(delay)
+        if status != 200:
+            return web.Response(status=status)
+        return web.json_response({"data": {"node": name}})
+
+    async def syncing(request: web.Request):
+        return web.json_response({"data": {"is_syncing": is_syncing, "el_offline": False}})
+
+    app = web.Application()
+    app.router.add_get("/eth/v1/beacon/states/{state_id}/finality_checkpoints", finality_checkpoints)
+    app.router.add_get("/eth/v1/node/syncing", syncing)
+    return app, requests
+
+
+@pytest.mark.asyncio()
+async def test_routes_to_fastest_node():
+    slow_app, slow_requests = beacon_node_app("slow", delay=0.05)
+    fast_app, fast_requests = beacon_node_app("fast")
+
+    async with TestServer(slow_app) as slow, TestServer(fast_app) as fast:
+        urls = [str(slow.make_url("")), str(fast.make_url(""))]
+        async with AsyncBeaconPool(urls, logger=logging.getLogger()) as pool:
+            # both nodes are measured first, then the fast one takes over
+            responses = [await pool.get_finality_checkpoint() for _ in range(10)]
+
+    assert responses[-1] == {"data": {"node": "fast"}}
+    assert len(slow_requests) == 1
+    assert len(fast_requests) == 9
+
+
+@pytest.mark.asyncio()
+async def test_fails_over_on_server_errors():
+    broken_app, broken_requests = beacon_node_app("broken", status=503)
+    healthy_app, _ = beacon_node_app("healthy", delay=0.01)
+
+    async with TestServer(broken_app) as broken, TestServer(healthy_app) as healthy:
+        urls = [str(broken.make_url("")), str(healthy.make_url(""))]
+        async with AsyncBeaconPool(urls, logger=logging.getLogger(), failure_cooldown=60.0) as pool:
+            for _ in range(5):
+                assert await pool.get_finality_checkpoint() == {"data": {"node": "healthy"}}
+
+            assert pool.nodes[0].failures == 1
+            assert len(broken_requests) == 1
+
+
+@pytest.mark.asyncio()
+async def test_health_checks_skip_syncing_nodes():
+    syncing_app, syncing_requests = beacon_node_app("syncing", is_syncing=True)
+    synced_app, _ = beacon_node_app("synced", delay=0.01)
+
+    async with TestServer(syncing_app) as syncing, TestServer(synced_app) as synced:
+        urls = [str(syncing.make_url("")), str(synced.make_url(""))]
+        async with AsyncBeaconPool(urls, logger=logging.getLogger()) as pool:
+            assert await pool.check_health() == {urls[0]: False, urls[1]: True}
+            assert await pool.get_finality_checkpoint() == {"data": {"node": "synced"}}
+
+    assert syncing_requests == []
+
+
+@pytest.mark.asyncio()
+async def test_hedges_slow_requests():
+    stall = {"enabled": False, "released": asyncio.Event()}
+
+    async def stalling_finality_checkpoints(request: web.Request):
+        if stall["enabled"]:
+            await stall["released"].wait()
+        return web.json_response({"data": {"node": "primary"}})
+
+    primary_app = web.Application()
+    primary_app.router.add_get("/eth/v1/beacon/states/{state_id}/finality_checkpoints", stalling_finality_checkpoints)
+    secondary_app, _ = beacon_node_app("secondary", delay=0.02)
+
+    async with TestServer(primary_app) as primary, TestServer(secondary_app) as secondary:
+        urls = [str(primary.make_url("")), str(secondary.make_url(""))]
+        async with AsyncBeaconPool(urls, logger=logging.getLogger(), hedge_percentile=0.9) as pool:
+            for _ in range(5):
+                await pool.get_finality_checkpoint()
+            assert pool.hedged_requests == 0
+
+            # the primary node stalls, the hedged request to the secondary answers first
+            stall["enabled"] = True
+            assert await pool.get_finality_checkpoint() == {"data": {"node": "secondary"}}
+            assert pool.hedged_requests == 1
+            stall["released"].set()
+
+
+@pytest.mark.asyncio()
+async def test_ssz_fallback_is_per_node():
+    ssz_requests = []
+
+    def pending_partial_withdrawals_app(name: str, supports_ssz: bool):
+        async def pending_partial_withdrawals(request: web.Request):
+            if "application/octet-stream" in request.headers.get("Accept", ""):
+                if not supports_ssz:
+                    return web.Response(status=406)
+                ssz_requests.append(name)
+                return web.Response(
+                    body=struct.pack("<QQQ", 7, 1000000000, 300),
+                    content_type="application/octet-stream",
+                    headers={"Eth-Consensus-Version": "electra"},
+                )
+            return web.json_response({"data": [{"validator_index": "7", "amount": "1000000000", "withdrawable_epoch": "300"}]})
+
+        app = web.Application()
+        app.router.add_get("/eth/v1/beacon/states/{state_id}/pending_partial_withdrawals", pending_partial_withdrawals)
+        return app
+
+    json_only_app = pending_partial_withdrawals_app("json_only", supports_ssz=False)
+    ssz_app = pending_partial_withdrawals_app("ssz", supports_ssz=True)
+    async with TestServer(json_only_app) as json_only, TestServer(ssz_app) as ssz:
+        urls = [str(json_only.make_url("")), str(ssz.make_url(""))]
+        async with AsyncBeaconPool(urls, logger=logging.getLogger(), ssz=True) as pool:
+            # the JSON fallback measures the first node, so the unmeasured second node is picked next
+            for _ in range(2):
+                response = await pool.get_pending_partial_withdrawals()
+                assert response["data"] == [PendingPartialWithdrawal(7, 1000000000, 300)]
+
+            assert pool._ssz_unsupported == {(urls[0], PENDING_PARTIAL_WITHDRAWALS)}
+
+    assert ssz_requests == ["ssz"]
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+
+import pytest
+from pytest_mock import MockerFixture
+
+from web3_utils import balance_tracker
+from web3_utils.async_beacon import AsyncBeacon
+from web3_utils.balance_tracker import BalanceTracker
+
+
+def fake_balances_endpoint(state: dict):
+    async def request(method, endpoint, params=None, json_data=None):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+
+        slot = int(endpoint.split("/")[5])
+        state["slots"].append(slot)
+        # validator 3 only exists from slot 64 on
+        return {
+            "data": [
+                {"index": id, "balance": str(32_000_000_000 + slot * int(id))} for id in params["id"] if id != "3" or slot >= 64
+            ]
+        }
+
+    return request
+
+
+@pytest.fixture
+def beacon_state(mocker: MockerFixture):
+    state = {"in_flight": 0, "max_in_flight": 0, "slots": []}
+    mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", side_effect=fake_balances_endpoint(state))
+    return state
+
+
+@pytest.mark.asyncio()
+async def test_backfill_and_deltas(beacon_state, tmp_path):
+    beacon = AsyncBeacon("http://localhost:5052", logging.getLogger())
+    file_path = str(tmp_path / "balances.bin")
+
+    tracker = BalanceTracker(beacon, [1, 2, 3], file_path, max_concurrency=2)
+    assert await tracker.backfill(0, 4) == [0, 1, 2, 3, 4]
+    assert beacon_state["max_in_flight"] == 2
+    assert sorted(beacon_state["slots"]) == [0, 32, 64, 96, 128]
+
+    assert list(tracker.balances(1)) == [32_000_000_032, 32_000_000_064, -1]
+    assert list(tracker.deltas(1, 3)) == [64, 128, 0]
+    assert list(tracker.deltas(2, 3)) == [32, 64, 96]
+    assert tracker.total_delta(2, 4) == 64 + 128 + 192
+    assert tracker.total_balance(1) == 64_000_000_096
+
+    # the history survives restarts, only new epochs are fetched
+    beacon_state["slots"].clear()
+    tracker = BalanceTracker(beacon, [1, 2, 3], file_path)
+    assert tracker.epochs == [0, 1, 2, 3, 4]
+    assert await tracker.backfill(3, 6) == [5, 6]
+    assert beacon_state["slots"] == [160, 192]
+
+    with pytest.raises(ValueError):
+        BalanceTracker(beacon, [1, 2], file_path)
+
+
+@pytest.mark.asyncio()
+async def test_torn_column_is_dropped(beacon_state, tmp_path):
+    beacon = AsyncBeacon("http://localhost:5052", logging.getLogger())
+    file_path = tmp_path / "balances.bin"
+
+    tracker = BalanceTracker(beacon, [1, 2], str(file_path))
+    await tracker.backfill(0, 1)
+    size = file_path.stat().st_size
+    with open(file_path, "ab") as f:
+        f.write(b"\x00" * 10)
+
+    assert BalanceTracker(beacon, [1, 2], str(file_path)).epochs == [0, 1]
+    assert file_path.stat().st_size == size
+
+
+@pytest.mark.asyncio()
+async def test_concurrent_fetches_of_an_epoch_share_a_request(beacon_state, tmp_path):
+    beacon = AsyncBeacon("http://localhost:5052", logging.getLogger())
+    file_path = tmp_path / "balances.bin"
+    tracker = BalanceTracker(beacon, [1, 2], str(file_path))
+    size = file_path.stat().st_size
+
+    first, second = await asyncio.gather(tracker.fetch_epoch(5), tracker.fetch_epoch(5))
+
+    assert first is second
+    assert beacon_state["slots"] == [160]
+    assert file_path.stat().st_size == size + 8 + 2 * 8
+
+
+class StopRun(Exception):
+    pass
+
+
+@pytest.mark.asyncio()
+async def test_run_starts_from_the_next_epoch(beacon_state, tmp_path, mocker: MockerFixture):
+    beacon = AsyncBeacon("http://localhost:5052", logging.getLogger())
+    tracker = BalanceTracker(beacon, [1, 2], str(tmp_path / "balances.bin"))
+    epoch_seconds = 12 * 32
+    clock = [99 * epoch_seconds + 10]
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        sleeps.append(delay)
+        if tracker.epochs and len(sleeps) > 2:
+            raise StopRun()
+        # the first sleep ends 10 seconds early, before epoch 100 started
+        clock[0] += delay - 10 if len(sleeps) == 1 else delay
+        await real_sleep(0)
+
+    mocker.patch.object(balance_tracker.time, "time", side_effect=lambda: clock[0])
+    mocker.patch.object(balance_tracker.asyncio, "sleep", side_effect=sleep)
+
+    with pytest.raises(StopRun):
+        await tracker.run(genesis_time=0, delay=4.0)
+
+    assert tracker.epochs == [100]
+    assert beacon_state["slots"] == [3200]
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from array import array
+
+import pytest
+from pytest_mock import MockerFixture
+
+from web3_utils.async_beacon import AsyncBeacon
+from web3_utils.beacon_clock import BeaconClock
+
+
+def test_conversions():
+    clock = BeaconClock(1000)
+
+    assert clock.time_at_slot(10) == 1120
+    assert clock.slot_at(1120) == 10 and clock.slot_at(1131.9) == 10
+    assert clock.epoch_at_slot(63) == 1 and clock.start_slot_of_epoch(2) == 64
+    assert clock.time_at_epoch(1) == 1000 + 32 * 12
+    assert clock.epoch_at(1000 + 32 * 12 - 1) == 0
+
+    assert clock.times_at_slots(range(0, 10, 2)) == range(1000, 1120, 24)
+    assert list(clock.times_at_slots(range(3))) == [1000, 1012, 1024]
+    assert clock.times_at_slots([5, 1]) == array("q", [1060, 1012])
+    assert clock.slots_at([1000, 1011, 1012, 2000.5]) == array("q", [0, 0, 1, 83])
+    assert clock.epochs_at_slots(range(30, 35)) == array("q", [0, 0, 1, 1, 1])
+    assert clock.start_slots_of_epochs(range(1, 3)) == range(32, 96, 32)
+    assert clock.start_slots_of_epochs([3]) == array("q", [96])
+
+
+def test_custom_spec_constants():
+    clock = BeaconClock(0, seconds_per_slot=5, slots_per_epoch=8, clock=lambda: 100)
+
+    assert clock.current_slot() == 20
+    assert clock.current_epoch() == 2
+
+
+@pytest.mark.asyncio()
+async def test_from_beacon(mocker: MockerFixture):
+    mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", return_value={"data": {"genesis_time": "1606824023"}})
+
+    clock = await BeaconClock.from_beacon(AsyncBeacon("http://localhost:5052", logging.getLogger()), slots_per_epoch=16)
+    assert clock.genesis_time == 1606824023
+    assert clock.slots_per_epoch == 16
+
+
+@pytest.mark.asyncio()
+async def test_ticks_sleep_until_boundaries(mocker: MockerFixture):
+    now = {"time": 1000 + 12 * 5 + 7}
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        now["time"] += seconds
+
+    mocker.patch("web3_utils.beacon_clock.asyncio.sleep", side_effect=sleep)
+    clock = BeaconClock(1000, clock=lambda: now["time"])
+
+    ticks = clock.ticks(offset=1.5)
+    assert [await ticks.__anext__() for _ in range(3)] == [6, 7, 8]
+    assert sleeps == [6.5, 12.0, 12.0]
+
+    # slots passed while the consumer was busy are skipped
+    now["time"] += 30
+    assert await ticks.__anext__() == 11
+    assert now["time"] == 1000 + 11 * 12 + 1.5
+
+    epochs = clock.ticks(per_epoch=True)
+    assert await epochs.__anext__() == 1
+    assert now["time"] == 1000 + 32 * 12
+
+    await ticks.aclose()
+    await epochs.aclose()
@@ -0,0 +1,74 @@
+import asyncio
+import math
+
+import pytest
+from pytest_mock import MockerFixture
+
+from web3_utils.beacon_response_cache import BeaconResponseCache
+
+
+def test_ttl_by_state():
+    cache = BeaconResponseCache(head_ttl=1.0, finalized_ttl=12.0)
+
+    assert cache.ttl("/eth/v1/beacon/genesis") == math.inf
+    assert cache.ttl("/eth/v1/beacon/states/123/validators") == math.inf
+    assert cache.ttl("/eth/v1/beacon/states/0xabc/finality_checkpoints") == math.inf
+    assert cache.ttl("/eth/v1/beacon/states/finalized/validator_balances") == 12.0
+    assert cache.ttl("/eth/v1/beacon/states/head/validators/0x01") == 1.0
+    assert cache.ttl("/eth/v1/beacon/states/justified/validators") == 1.0
+    assert cache.ttl("/eth/v1/node/syncing") is None
+
+
+@pytest.mark.asyncio()
+async def test_lru_eviction_and_expiry(mocker: MockerFixture):
+    now = mocker.patch("web3_utils.beacon_response_cache.time.monotonic", return_value=100.0)
+    cache = BeaconResponseCache(max_entries=2)
+
+    async def fetch(value):
+        return value
+
+    assert await cache.get_or_fetch("a", math.inf, lambda: fetch(1)) == 1
+    assert await cache.get_or_fetch("b", 1.0, lambda: fetch(2)) == 2
+    assert await cache.get_or_fetch("a", math.inf, lambda: fetch(10)) == 1
+    assert await cache.get_or_fetch("c", math.inf, lambda: fetch(3)) == 3
+
+    # "b" was the least recently used entry
+    assert await cache.get_or_fetch("b", 1.0, lambda: fetch(20)) == 20
+    assert await cache.get_or_fetch("b", 1.0, lambda: fetch(21)) == 20
+
+    now.return_value = 101.5
+    assert await cache.get_or_fetch("b", 1.0, lambda: fetch(22)) == 22
+    assert cache.stats() == {"hits": 2, "misses": 5, "coalesced": 0, "entries": 2}
+
+
+@pytest.mark.asyncio()
+async def test_concurrent_misses_are_coalesced():
+    cache = BeaconResponseCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"data": "value"}
+
+    results = await asyncio.gather(*[cache.get_or_fetch("key", math.inf, fetch) for _ in range(10)])
+
+    assert results == [{"data": "value"}] * 10
+    assert len(calls) == 1
+    assert cache.stats() == {"hits": 0, "misses": 1, "coalesced": 9, "entries": 1}
+
+
+@pytest.mark.asyncio()
+async def test_failed_fetch_is_not_cached():
+    cache = BeaconResponseCache()
+
+    async def fail():
+        raise ValueError("Oops")
+
+    async def fetch():
+        return 1
+
+    with pytest.raises(ValueError):
+        await cache.get_or_fetch("key", math.inf, fail)
+
+    assert await cache.get_or_fetch("key", math.inf, fetch) == 1
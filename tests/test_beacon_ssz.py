@@ -0,0 +1,64 @@
+import struct
+
+import pytest
+
+from web3_utils.beacon_ssz import (
+    PENDING_CONSOLIDATIONS,
+    PENDING_DEPOSITS,
+    PENDING_PARTIAL_WITHDRAWALS,
+    PendingConsolidation,
+    PendingDeposit,
+    PendingPartialWithdrawal,
+)
+
+PUBKEY = bytes.fromhex("a" * 96)
+WITHDRAWAL_CREDENTIALS = bytes.fromhex("01" + "0" * 22 + "b" * 40)
+SIGNATURE = bytes.fromhex("c" * 192)
+
+
+def test_decode_pending_deposits():
+    payload = PUBKEY + WITHDRAWAL_CREDENTIALS + (32 * 10**9).to_bytes(8, "little") + SIGNATURE + (1234).to_bytes(8, "little")
+
+    assert PENDING_DEPOSITS.decode(payload * 2) == [
+        PendingDeposit(PUBKEY, WITHDRAWAL_CREDENTIALS, 32 * 10**9, SIGNATURE, 1234),
+        PendingDeposit(PUBKEY, WITHDRAWAL_CREDENTIALS, 32 * 10**9, SIGNATURE, 1234),
+    ]
+    assert PENDING_DEPOSITS.encode(PENDING_DEPOSITS.decode(payload)) == payload
+
+
+def test_decode_pending_withdrawals_and_consolidations():
+    assert PENDING_PARTIAL_WITHDRAWALS.decode(struct.pack("<QQQ", 7, 10**9, 300)) == [PendingPartialWithdrawal(7, 10**9, 300)]
+    assert PENDING_CONSOLIDATIONS.decode(struct.pack("<QQQQ", 1, 2, 3, 4)) == [
+        PendingConsolidation(1, 2),
+        PendingConsolidation(3, 4),
+    ]
+    assert PENDING_CONSOLIDATIONS.decode(b"") == []
+
+
+def test_decode_rejects_truncated_payload():
+    with pytest.raises(ValueError):
+        PENDING_CONSOLIDATIONS.decode(struct.pack("<QQQ", 1, 2, 3))
+
+
+def test_from_json_response():
+    response = {
+        "version": "electra",
+        "execution_optimistic": False,
+        "finalized": True,
+        "data": [
+            {
+                "pubkey": "0x" + PUBKEY.hex(),
+                "withdrawal_credentials": "0x" + WITHDRAWAL_CREDENTIALS.hex(),
+                "amount": "32000000000",
+                "signature": "0x" + SIGNATURE.hex(),
+                "slot": "1234",
+            }
+        ],
+    }
+
+    assert PENDING_DEPOSITS.from_json_response(response) == {
+        "version": "electra",
+        "execution_optimistic": False,
+        "finalized": True,
+        "data": [PendingDeposit(PUBKEY, WITHDRAWAL_CREDENTIALS, 32 * 10**9, SIGNATURE, 1234)],
+    }
@@ -0,0 +1,196 @@
+import logging
+import threading
+
+import pytest
+from hexbytes import HexBytes
+from pytest_mock import MockerFixture
+from web3 import AsyncHTTPProvider, Web3
+from web3.eth import AsyncEth, Eth
+from web3.main import get_async_default_modules
+
+from web3_utils.block_cache import BlockCache, MemoryBlockStore, SqliteBlockStore
+from web3_utils.retryable_eth_module import get_retryable_eth_module
+
+
+def block(number: int, fork: int = 0):
+    def block_hash(n):
+        return HexBytes(bytes([fork if n >= fork_at else 0, n % 256]) * 16)
+
+    fork_at = 8
+    return {"number": number, "hash": block_hash(number), "parentHash": block_hash(number - 1)}
+
+
+class FakeNode:
+    def __init__(self, head: int):
+        self.head = head
+        self.fork = 0
+        self.calls = []
+
+    async def get_block(self, block_identifier, full_transactions=False):
+        self.calls.append(("get_block", block_identifier))
+        if block_identifier == "latest":
+            return block(self.head, self.fork)
+        if isinstance(block_identifier, int):
+            return block(block_identifier, self.fork)
+        # blocks of both forks stay available by hash, like uncles and reorged out blocks on a node
+        return next(block(n, fork) for fork in (0, 1) for n in range(self.head + 1) if block(n, fork)["hash"] == block_identifier)
+
+    async def get_transaction_receipt(self, transaction_hash):
+        self.calls.append(("get_transaction_receipt", transaction_hash))
+        return {"transactionHash": transaction_hash, "blockNumber": 9}
+
+    async def get_logs(self, filter_params):
+        self.calls.append(("get_logs", filter_params))
+        return [{"blockNumber": filter_params.get("fromBlock")}]
+
+
+@pytest.mark.asyncio()
+async def test_blocks_are_cached_by_number_and_hash():
+    node, cache = FakeNode(head=10), BlockCache(confirmations=2)
+
+    first = await cache.get_block(node.get_block, 5)
+    assert await cache.get_block(node.get_block, 5) is first
+    assert await cache.get_block(node.get_block, first["hash"]) is first
+    assert await cache.get_block(node.get_block, "0x" + bytes(first["hash"]).hex()) is first
+    assert len(node.calls) == 1
+
+    await cache.get_block(node.get_block, 5, full_transactions=True)
+    await cache.get_block(node.get_block, "latest")
+    await cache.get_block(node.get_block, "latest")
+    assert len(node.calls) == 4
+    assert cache.head_number == 10 and cache.confirmed_number == 8
+    assert cache.stats()["hits"] == 3
+
+
+@pytest.mark.asyncio()
+async def test_reorg_drops_unconfirmed_entries():
+    node, cache = FakeNode(head=10), BlockCache(confirmations=3)
+    await cache.get_block(node.get_block, "latest")
+    for number in range(5, 11):
+        await cache.get_block(node.get_block, number)
+    await cache.get_transaction_receipt(node.get_transaction_receipt, "0xaa")
+
+    # blocks from 8 on are replaced and the new head doesn't build on the cached block 9
+    node.fork, node.head = 1, 11
+    await cache.get_block(node.get_block, "latest")
+    assert cache.reorgs == 1
+
+    node.calls.clear()
+    await cache.get_block(node.get_block, 7)
+    assert node.calls == []
+    assert (await cache.get_block(node.get_block, 9))["hash"] == block(9, fork=1)["hash"]
+    await cache.get_transaction_receipt(node.get_transaction_receipt, "0xaa")
+    assert [name for name, _ in node.calls] == ["get_block", "get_transaction_receipt"]
+
+
+@pytest.mark.asyncio()
+async def test_blocks_fetched_by_hash_dont_follow_the_chain():
+    node, cache = FakeNode(head=10), BlockCache(confirmations=2)
+    for number in range(8, 11):
+        await cache.get_block(node.get_block, number)
+
+    orphan = await cache.get_block(node.get_block, block(9, fork=1)["hash"])
+    assert orphan["hash"] == block(9, fork=1)["hash"]
+    assert cache.reorgs == 0
+
+    node.calls.clear()
+    assert (await cache.get_block(node.get_block, 9))["hash"] == block(9)["hash"]
+    assert await cache.get_block(node.get_block, block(9, fork=1)["hash"]) == orphan
+    assert node.calls == []
+
+
+@pytest.mark.asyncio()
+async def test_logs_are_cached_for_confirmed_ranges_and_block_hashes():
+    node, cache = FakeNode(head=100), BlockCache(confirmations=10)
+    await cache.get_block(node.get_block, "latest")
+
+    for _ in range(2):
+        await cache.get_logs(node.get_logs, {"fromBlock": 10, "toBlock": 90, "address": "0x01"})
+        await cache.get_logs(node.get_logs, {"blockHash": HexBytes(b"\x01" * 32)})
+        await cache.get_logs(node.get_logs, {"fromBlock": 10, "toBlock": 91})
+        await cache.get_logs(node.get_logs, {"fromBlock": 10, "toBlock": "latest"})
+
+    assert len([call for call in node.calls if call[0] == "get_logs"]) == 6
+
+
+@pytest.mark.asyncio()
+async def test_sqlite_store_survives_restarts(tmp_path):
+    file_path = str(tmp_path / "blocks.sqlite")
+    node = FakeNode(head=20)
+
+    cache = BlockCache(confirmations=5, store=SqliteBlockStore(file_path))
+    await cache.get_block(node.get_block, "latest")
+    await cache.get_block(node.get_block, 12)
+    cache.store.close()
+
+    node.calls.clear()
+    cache = BlockCache(confirmations=5, store=SqliteBlockStore(file_path))
+    assert cache.confirmed_number == 15
+    assert (await cache.get_block(node.get_block, 12))["number"] == 12
+    assert node.calls == []
+
+
+@pytest.mark.asyncio()
+async def test_sqlite_store_runs_off_the_event_loop(tmp_path, mocker: MockerFixture):
+    node = FakeNode(head=20)
+    store = SqliteBlockStore(str(tmp_path / "blocks.sqlite"))
+    cache = BlockCache(confirmations=5, store=store)
+    threads = []
+    for name in ("get", "put", "delete_above"):
+        original = getattr(store, name)
+        mocker.patch.object(
+            store, name, side_effect=lambda *args, original=original: threads.append(threading.get_ident()) or original(*args)
+        )
+
+    await cache.get_block(node.get_block, "latest")
+    assert (await cache.get_block(node.get_block, 12))["number"] == 12
+    assert (await cache.get_block(node.get_block, 12))["number"] == 12
+    await cache.get_transaction_receipt(node.get_transaction_receipt, "0xaa")
+    await cache.get_logs(node.get_logs, {"fromBlock": 1, "toBlock": 10})
+
+    assert threads and threading.get_ident() not in threads
+    assert len(set(threads)) == 1
+    assert cache.stats()["hits"] == 1
+    store.close()
+
+
+def test_sqlite_store_batches_commits(tmp_path):
+    file_path = str(tmp_path / "blocks.sqlite")
+    store = SqliteBlockStore(file_path, commit_interval=3600)
+    reader = SqliteBlockStore(file_path)
+
+    store.put("block:1", 1, 1)
+    store.put("block:2", 2, 2)
+    assert len(reader) == 0
+
+    store.flush()
+    assert len(reader) == 2
+    assert store.delete_above(1) == 1
+    assert len(reader) == 1
+    store.close()
+    reader.close()
+
+
+def test_memory_store_is_bounded():
+    store = MemoryBlockStore(max_entries=2)
+    for number in range(3):
+        store.put(f"block:{number}", number, number)
+
+    assert len(store) == 2
+    assert store.delete_above(1) == 1
+
+
+@pytest.mark.asyncio()
+async def test_retryable_module_uses_the_cache(mocker: MockerFixture):
+    node = FakeNode(head=10)
+    mocker.patch("web3.module.retrieve_async_method_call_fn", return_value=lambda method: node.get_block)
+    web3_modules = get_async_default_modules()
+    web3_modules["eth"] = get_retryable_eth_module(AsyncEth, logger=logging.getLogger(), block_cache=BlockCache())
+    web3 = Web3(AsyncHTTPProvider("http://127.0.0.1:8545"), modules=web3_modules)
+
+    assert (await web3.eth.get_block(3))["number"] == 3
+    assert (await web3.eth.get_block(3))["number"] == 3
+    assert len(node.calls) == 1
+
+    with pytest.raises(ValueError):
+        get_retryable_eth_module(Eth, logger=logging.getLogger(), block_cache=BlockCache())
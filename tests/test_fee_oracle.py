@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from web3_utils.calculate_max_fees import calculate_max_tx_fees
+from web3_utils.fee_oracle import FeeOracle, Fees
+
+
+class FakeEth:
+    def __init__(self):
+        self.head = {"number": 100, "baseFeePerGas": 10}
+        self.calls = []
+
+    async def get_block(self, block_identifier):
+        self.calls.append("get_block")
+        await asyncio.sleep(0.01)
+        return self.head
+
+    @property
+    async def max_priority_fee(self):
+        self.calls.append("max_priority_fee")
+        await asyncio.sleep(0.01)
+        return 2
+
+    @property
+    async def block_number(self):
+        return self.head["number"]
+
+    async def fee_history(self, block_count, newest_block, reward_percentiles):
+        self.calls.append("fee_history")
+        return {
+            "oldestBlock": self.head["number"] - 2,
+            "baseFeePerGas": [8, 9, 10, 11],
+            "reward": [[1], [5], [3]],
+        }
+
+
+def fake_web3():
+    return SimpleNamespace(eth=FakeEth())
+
+
+@pytest.mark.asyncio()
+async def test_calculate_max_tx_fees():
+    assert await calculate_max_tx_fees(fake_web3()) == (22, 2)
+
+
+@pytest.mark.asyncio()
+async def test_fees_are_shared_while_current():
+    web3 = fake_web3()
+    oracle = FeeOracle(web3, max_age=60)
+
+    results = await asyncio.gather(*[oracle.get_max_tx_fees() for _ in range(50)])
+    assert set(results) == {(22, 2)}
+    assert await oracle.get_fees() == Fees(100, 10, 22, 2)
+    assert sorted(web3.eth.calls) == ["get_block", "max_priority_fee"]
+    assert oracle.stats() == {"hits": 1, "refreshes": 1, "coalesced": 49}
+
+    oracle.max_age = 0
+    await oracle.get_fees()
+    assert len(web3.eth.calls) == 4
+
+
+@pytest.mark.asyncio()
+async def test_fee_history_percentile():
+    web3 = fake_web3()
+    oracle = FeeOracle(web3, priority_fee_percentile=50)
+
+    assert await oracle.get_fees() == Fees(100, 10, 23, 3)
+    assert web3.eth.calls == ["fee_history"]
+
+
+@pytest.mark.asyncio()
+async def test_polling_follows_heads():
+    web3 = fake_web3()
+    oracle = FeeOracle(web3, max_age=0)
+    polling = asyncio.ensure_future(oracle.run_polling(poll_interval=0.01))
+    try:
+        await asyncio.sleep(0.05)
+        assert oracle.following
+        refreshes = oracle.refreshes
+        assert (await oracle.get_fees()).block_number == 100
+        assert oracle.refreshes == refreshes
+
+        web3.eth.head = {"number": 101, "baseFeePerGas": 20}
+        await asyncio.sleep(0.05)
+        assert oracle.fees.block_number == 101
+        assert await oracle.get_max_tx_fees() == (42, 2)
+    finally:
+        polling.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await polling
+
+    assert not oracle.following
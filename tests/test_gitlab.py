@@ -1,6 +1,8 @@
 import base64
+import io
 import os
 import pytest
+import tarfile
 from unittest.mock import Mock
 from web3_utils.gitlab import GitLab
 
@@ -43,7 +45,7 @@ def test_download_files_from_project(gitlab_instance, mocker):
     ]
     assert downloaded_files == expected_paths
     repo_tree_mock.assert_called_once_with(ref="main", path="test_dir", get_all=True)
-    repo_blob_mock.assert_has_calls([mocker.call("file_id_1"), mocker.call("file_id_2")])
+    repo_blob_mock.assert_has_calls([mocker.call("file_id_1"), mocker.call("file_id_2")], any_order=True)
 
 
 def test_download_files_from_project_with_include_only_files(gitlab_instance, mocker):
@@ -78,7 +80,7 @@ def test_download_files_from_project_with_include_only_files(gitlab_instance, mo
     ]
     assert downloaded_files == expected_paths
     repo_tree_mock.assert_called_once_with(ref="main", path="test_dir", get_all=True)
-    repo_blob_mock.assert_has_calls([mocker.call("file_id_1"), mocker.call("file_id_2")])
+    repo_blob_mock.assert_has_calls([mocker.call("file_id_1"), mocker.call("file_id_2")], any_order=True)
 
 
 def test_prepare_temp_directory(gitlab_instance, mocker):
@@ -117,3 +119,110 @@ def test_prepare_temp_directory(gitlab_instance, mocker):
     assert sorted(os.listdir("tmp/public_keys")) == sorted(
         [os.path.basename(file_path) for file_path in expected_files_after_cleanup]
     )
+
+
+def test_incremental_download(mocker, tmp_path):
+    gitlab_mock = Mock()
+    mocker.patch("web3_utils.gitlab.Gitlab", return_value=gitlab_mock)
+    gitlab = GitLab(url="fake_url", token="fake_token", tmp_dir=str(tmp_path), max_workers=4)
+
+    project = gitlab_mock.projects.get(1)
+    blobs = {
+        "sha_1": b"file1 content",
+        "sha_2": b"file2 content",
+        "sha_2b": b"file2 new content",
+        "sha_3": b"file3 content",
+    }
+    repo_blob_mock = mocker.patch.object(
+        project, "repository_blob", side_effect=lambda sha: {"content": base64.b64encode(blobs[sha]).decode("utf-8")}
+    )
+
+    project.repository_tree.return_value = [
+        {"id": "sha_1", "name": "file1.txt", "type": "blob"},
+        {"id": "sha_2", "name": "file2.txt", "type": "blob"},
+        {"id": "sha_3", "name": "file3.txt", "type": "blob"},
+        {"id": "tree_sha", "name": "subdir", "type": "tree"},
+    ]
+    assert gitlab.download_files_from_project(project_id=1, dir_path="keys", incremental=True) == [
+        str(tmp_path / "file1.txt"),
+        str(tmp_path / "file2.txt"),
+        str(tmp_path / "file3.txt"),
+    ]
+    assert repo_blob_mock.call_count == 3
+
+    # file2 changed, file3 was removed and an unrelated local file stays untouched
+    (tmp_path / "local.txt").write_text("local")
+    project.repository_tree.return_value = [
+        {"id": "sha_1", "name": "file1.txt", "type": "blob"},
+        {"id": "sha_2b", "name": "file2.txt", "type": "blob"},
+    ]
+    repo_blob_mock.reset_mock()
+    downloaded_files = gitlab.download_files_from_project(project_id=1, dir_path="keys", incremental=True)
+
+    assert downloaded_files == [str(tmp_path / "file1.txt"), str(tmp_path / "file2.txt")]
+    repo_blob_mock.assert_called_once_with("sha_2b")
+    assert (tmp_path / "file2.txt").read_text() == "file2 new content"
+    assert sorted(os.listdir(tmp_path)) == [".manifest.json", "file1.txt", "file2.txt", "local.txt"]
+
+    # a deleted local file is downloaded again
+    os.remove(tmp_path / "file1.txt")
+    repo_blob_mock.reset_mock()
+    gitlab.download_files_from_project(project_id=1, dir_path="keys", incremental=True)
+    repo_blob_mock.assert_called_once_with("sha_1")
+
+
+def test_failed_download_is_raised(mocker, tmp_path):
+    gitlab_mock = Mock()
+    mocker.patch("web3_utils.gitlab.Gitlab", return_value=gitlab_mock)
+    gitlab = GitLab(url="fake_url", token="fake_token", tmp_dir=str(tmp_path))
+
+    project = gitlab_mock.projects.get(1)
+    project.repository_tree.return_value = [{"id": "sha_1", "name": "file1.txt", "type": "blob"}]
+    project.repository_blob.side_effect = ConnectionError("boom")
+
+    with pytest.raises(ConnectionError):
+        gitlab.download_files_from_project(project_id=1, dir_path="keys", incremental=True)
+    assert not os.path.exists(tmp_path / ".manifest.json")
+
+
+def tar_gz(files: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def test_download_archive_from_project(mocker, tmp_path):
+    gitlab_mock = Mock()
+    mocker.patch("web3_utils.gitlab.Gitlab", return_value=gitlab_mock)
+    gitlab = GitLab(url="fake_url", token="fake_token", tmp_dir=str(tmp_path / "public_keys"))
+
+    prefix = "keys-main-0123abcd"
+    archive = tar_gz(
+        {
+            f"{prefix}/validators/hoodi-lighthouse0-pubkeys.txt": b"0x01\n" * 1000,
+            f"{prefix}/validators/holesky-teku0-pubkeys.txt": b"0x02\n",
+            f"{prefix}/validators/mainnet-teku0-pubkeys.txt": b"0x03\n",
+            f"{prefix}/validators/nested/hoodi-nested.txt": b"0x04\n",
+        }
+    )
+    project = gitlab_mock.projects.get(1, lazy=True)
+    # small chunks, so extraction has to work across chunk boundaries
+    project.repository_archive.return_value = iter([archive[i : i + 100] for i in range(0, len(archive), 100)])
+
+    downloaded_files = gitlab.download_archive_from_project(
+        project_id=1, dir_path="validators", branch="main", include_only_files=["^hoodi", "^holesky"]
+    )
+
+    assert downloaded_files == [
+        str(tmp_path / "public_keys" / "hoodi-lighthouse0-pubkeys.txt"),
+        str(tmp_path / "public_keys" / "holesky-teku0-pubkeys.txt"),
+    ]
+    assert (tmp_path / "public_keys" / "hoodi-lighthouse0-pubkeys.txt").read_bytes() == b"0x01\n" * 1000
+    assert sorted(os.listdir(tmp_path / "public_keys")) == ["holesky-teku0-pubkeys.txt", "hoodi-lighthouse0-pubkeys.txt"]
+    project.repository_archive.assert_called_once_with(
+        sha="main", format="tar.gz", path="validators", streamed=True, iterator=True, chunk_size=64 * 1024
+    )
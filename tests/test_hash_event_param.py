@@ -1,7 +1,28 @@
-from web3_utils.hash_event_param import hash_event_param
+import pytest
+
+from web3_utils.hash_event_param import hash_event_param, hash_event_params
 
 
 def test_hash_event_param():
     expected = "0x79fad56e6cf52d0c8c2c033d568fc36856ba2b556774960968d79274b0e6b944"
 
     assert hash_event_param("0x123456789") == expected
+
+
+@pytest.mark.parametrize("memoize", [True, False])
+def test_hash_event_params(memoize):
+    pubkey = "0x" + "ab" * 48
+    params = ["0x123456789", pubkey, bytes.fromhex("ab" * 48), memoryview(bytes.fromhex("ab" * 48)), "0x"]
+
+    assert hash_event_params(params, memoize=memoize) == [
+        "0x79fad56e6cf52d0c8c2c033d568fc36856ba2b556774960968d79274b0e6b944",
+        hash_event_param(pubkey),
+        hash_event_param(pubkey),
+        hash_event_param(pubkey),
+        hash_event_param("0x"),
+    ]
+
+
+def test_hash_event_params_rejects_unprefixed_strings():
+    with pytest.raises(ValueError):
+        hash_event_params(["123456"])
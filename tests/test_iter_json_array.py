@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from web3_utils.iter_json_array import iter_json_array
+
+
+async def as_chunks(payload: bytes, chunk_size: int):
+    for i in range(0, len(payload), chunk_size):
+        yield payload[i : i + chunk_size]
+
+
+async def collect(payload: bytes, chunk_size: int, key: str = "data"):
+    return [item async for item in iter_json_array(as_chunks(payload, chunk_size), key)]
+
+
+@pytest.mark.asyncio()
+async def test_iter_json_array():
+    document = {
+        "execution_optimistic": False,
+        "finalized": True,
+        "data": [
+            {"index": "0", "balance": "32000000000", "validator": {"pubkey": "0x" + "a" * 96, "slashed": False}},
+            {"index": "1", "balance": "31000000000", "status": "active_ongoing", "note": "żółw ] , {"},
+        ],
+    }
+    payload = json.dumps(document, ensure_ascii=False).encode("utf-8")
+
+    # every chunk size, including ones that split multibyte characters, tokens and numbers
+    for chunk_size in range(1, 40):
+        assert await collect(payload, chunk_size) == document["data"]
+
+
+@pytest.mark.asyncio()
+async def test_iter_json_array_scalars_and_empty():
+    assert await collect(b'{"data": [1, 22, 333]}', 1) == [1, 22, 333]
+    assert await collect(b'{"data":[]}', 3) == []
+    assert await collect(b'{"other": [1], "items": [2, 3]}', 4, key="items") == [2, 3]
+
+
+@pytest.mark.asyncio()
+async def test_iter_json_array_only_matches_top_level_keys():
+    payload = b'{"meta": {"data": [9]}, "note": "\\"data\\": [8]", "list": [{"data": [7]}], "d\\u0061ta": [1, 2]}'
+    for chunk_size in (1, 5, 100):
+        assert await collect(payload, chunk_size) == [1, 2]
+
+    with pytest.raises(ValueError):
+        await collect(b'{"meta": {"data": [9]}, "note": "\\"data\\": [8]"}', 3)
+
+
+@pytest.mark.asyncio()
+async def test_iter_json_array_closes_the_chunks():
+    closed = []
+
+    async def chunks():
+        try:
+            yield b'{"data": [1, 2, 3]}'
+            yield b"trailing"
+        finally:
+            closed.append(True)
+
+    assert [item async for item in iter_json_array(chunks())] == [1, 2, 3]
+    assert closed == [True]
+
+    items = iter_json_array(chunks())
+    assert await items.__anext__() == 1
+    await items.aclose()
+    assert closed == [True, True]
+
+
+@pytest.mark.asyncio()
+async def test_iter_json_array_truncated():
+    with pytest.raises(ValueError):
+        await collect(b'{"data": [{"index": "0"}, {"ind', 5)
+
+    with pytest.raises(ValueError):
+        await collect(b'{"message": "not found"}', 5)
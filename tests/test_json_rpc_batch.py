@@ -0,0 +1,131 @@
+import json
+import logging
+
+import pytest
+from pytest_mock import MockerFixture
+from web3 import AsyncHTTPProvider, HTTPProvider
+from web3.eth import AsyncEth, Eth
+from web3.exceptions import BlockNotFound
+from web3.main import Web3, get_default_modules, get_async_default_modules
+
+from web3_utils.json_rpc_batch import JsonRpcBatch
+from web3_utils.retry_policy import RetryPolicy
+from web3_utils.retryable_eth_module import get_retryable_eth_module
+
+
+class StopAfterThreeAttempts:
+    def __call__(self, retry_state) -> bool:
+        return retry_state.attempt_number >= 3
+
+
+def retryable_web3():
+    web3_modules = get_default_modules()
+    web3_modules["eth"] = get_retryable_eth_module(
+        Eth, logger=logging.getLogger(), retry_stop=StopAfterThreeAttempts, retry_policy=RetryPolicy(initial_wait=0)
+    )
+    return Web3(HTTPProvider("http://127.0.0.1:8545"), modules=web3_modules)
+
+
+def json_rpc_node(handler):
+    """Fake node answering every batch entry with handler(method, params, attempt)"""
+    posts = []
+
+    def post(endpoint_uri, data, **kwargs):
+        requests = json.loads(data)
+        posts.append(requests)
+        responses = [{"jsonrpc": "2.0", "id": request["id"], **handler(request, len(posts))} for request in requests]
+        return json.dumps(list(reversed(responses))).encode()
+
+    return post, posts
+
+
+def test_batch_demultiplexes_responses(mocker: MockerFixture):
+    post, posts = json_rpc_node(lambda request, attempt: {"result": hex(int(request["params"][1], 16) * 2)})
+    mocker.patch("web3_utils.json_rpc_batch.make_post_request", side_effect=post)
+
+    batch = retryable_web3().eth.batch(batch_size=2)
+    for i in range(5):
+        batch.add("get_balance", "0x" + "11" * 20, i)
+
+    assert isinstance(batch, JsonRpcBatch)
+    assert batch.execute() == [0, 2, 4, 6, 8]
+    assert [len(requests) for requests in posts] == [2, 2, 1]
+    assert posts[0][1]["method"] == "eth_getBalance"
+
+
+def test_batch_retries_only_failed_entries(mocker: MockerFixture):
+    def handler(request, attempt):
+        number = int(request["params"][0], 16)
+        if number == 1 and attempt == 1:
+            return {"result": None}
+        return {"result": {"number": hex(number)}}
+
+    post, posts = json_rpc_node(handler)
+    mocker.patch("web3_utils.json_rpc_batch.make_post_request", side_effect=post)
+
+    batch = retryable_web3().eth.batch()
+    for number in range(3):
+        batch.add("get_block", number)
+
+    assert [block["number"] for block in batch.execute()] == [0, 1, 2]
+    assert [[request["params"][0] for request in requests] for requests in posts] == [["0x0", "0x1", "0x2"], ["0x1"]]
+
+
+def test_batch_keeps_non_retryable_errors(mocker: MockerFixture):
+    def handler(request, attempt):
+        if request["params"][0] == "0x1":
+            return {"error": {"code": -32000, "message": "execution reverted"}}
+        return {"result": {"number": request["params"][0]}}
+
+    post, posts = json_rpc_node(handler)
+    mocker.patch("web3_utils.json_rpc_batch.make_post_request", side_effect=post)
+
+    batch = retryable_web3().eth.batch()
+    for number in range(3):
+        batch.add("get_block", number)
+
+    results = batch.execute(return_exceptions=True)
+    assert results[0]["number"] == 0 and results[2]["number"] == 2
+    assert isinstance(results[1], ValueError)
+    assert len(posts) == 1
+
+    with pytest.raises(ValueError):
+        batch.execute()
+
+
+def test_batch_raises_after_retries(mocker: MockerFixture):
+    post, posts = json_rpc_node(lambda request, attempt: {"result": None})
+    mocker.patch("web3_utils.json_rpc_batch.make_post_request", side_effect=post)
+
+    batch = retryable_web3().eth.batch()
+    batch.add("get_block", 1)
+
+    with pytest.raises(BlockNotFound):
+        batch.execute()
+    assert len(posts) == 3
+
+
+def test_batch_rejects_unknown_methods():
+    with pytest.raises(ValueError):
+        retryable_web3().eth.batch().add("not_an_rpc_method")
+
+
+@pytest.mark.asyncio()
+async def test_async_batch(mocker: MockerFixture):
+    post, posts = json_rpc_node(lambda request, attempt: {"result": hex(int(request["params"][1], 16) + 1)})
+
+    async def async_post(*args, **kwargs):
+        return post(*args, **kwargs)
+
+    mocker.patch("web3_utils.json_rpc_batch.async_make_post_request", side_effect=async_post)
+
+    web3_modules = get_async_default_modules()
+    web3_modules["eth"] = get_retryable_eth_module(AsyncEth, logger=logging.getLogger())
+    web3 = Web3(AsyncHTTPProvider("http://127.0.0.1:8545"), modules=web3_modules)
+
+    batch = web3.eth.batch(batch_size=10)
+    for i in range(3):
+        batch.add("get_balance", "0x" + "11" * 20, i)
+
+    assert await batch.execute() == [1, 2, 3]
+    assert len(posts) == 1
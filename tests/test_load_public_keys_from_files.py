@@ -2,7 +2,13 @@ import os
 import shutil
 import tempfile
 import pytest
-from web3_utils.load_public_keys_from_files import load_public_keys_from_files
+from web3_utils import load_public_keys_from_files as loader
+from web3_utils.load_public_keys_from_files import (
+    iter_public_keys_from_file,
+    load_public_key_files,
+    load_public_key_store,
+    load_public_keys_from_files,
+)
 
 file_content = [
     "0x000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000",
@@ -43,3 +49,54 @@ def test_load_public_keys_from_files(temp_dir_with_public_keys):
     result_b.extend(file_content)
     assert len(nft) == 10
     assert nft == result_b
+
+
+def test_load_public_key_store(temp_dir_with_public_keys):
+    with open(os.path.join(temp_dir_with_public_keys, "nft1-teku2-pubkeys.txt"), "w") as f:
+        f.write("\n0x" + "ab" * 48 + "\n\n" + "CD" * 48 + "\n")
+
+    store = load_public_key_store("nft", temp_dir_with_public_keys)
+
+    assert len(store) == 7
+    assert store.duplicates == 5
+    assert list(store.iter_hex()) == file_content + ["0x" + "ab" * 48, "0x" + "cd" * 48]
+    assert len(store.pubkeys) == 7 * 48
+    assert bytes(store.pubkey(1)) == b"\x11" * 48
+    assert [store.file_name(position) for position in (0, 4, 5, 6)] == ["nft1-teku0-pubkeys"] * 2 + ["nft1-teku2-pubkeys"] * 2
+    assert file_content[2] in store
+    assert b"\xcd" * 48 in store
+    assert "0x" + "ef" * 48 not in store
+
+
+@pytest.mark.parametrize("line", ["0x" + "ab" * 47, "0x" + "zz" * 48, "0x" + "ab" * 49, "ab" * 23 + " " + "ab" * 25])
+def test_invalid_public_keys(tmp_path, line):
+    file_path = tmp_path / "bulk1-pubkeys.txt"
+    file_path.write_text(f"{file_content[0]}\n{line}\n")
+
+    with pytest.raises(ValueError, match="bulk1-pubkeys.txt:2"):
+        list(iter_public_keys_from_file(str(file_path)))
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_load_public_key_files_in_parallel(temp_dir_with_public_keys, use_processes):
+    for i in range(2, 6):
+        with open(os.path.join(temp_dir_with_public_keys, f"nft1-teku{i}-pubkeys.txt"), "w") as f:
+            f.write(f"0x{i:096x}\n")
+
+    sequential = load_public_key_files("nft", temp_dir_with_public_keys)
+    parallel = load_public_key_files("nft", temp_dir_with_public_keys, parallel=True, max_workers=3, use_processes=use_processes)
+
+    assert parallel == sequential
+    assert [public_key_file["file_name"] for public_key_file in parallel] == [f"nft1-teku{i}-pubkeys" for i in range(6)]
+    assert parallel[0] == {"public_keys": file_content, "file_name": "nft1-teku0-pubkeys", "type": "nft"}
+
+
+def test_load_public_key_files_is_sequential_by_default(temp_dir_with_public_keys, mocker):
+    process_executor = mocker.spy(loader, "ProcessPoolExecutor")
+    thread_executor = mocker.spy(loader, "ThreadPoolExecutor")
+
+    assert len(load_public_key_files("nft", temp_dir_with_public_keys)) == 2
+    assert process_executor.call_count == 0 and thread_executor.call_count == 0
+
+    load_public_key_files("nft", temp_dir_with_public_keys, parallel=True)
+    assert process_executor.call_count == 0 and thread_executor.call_count == 1
@@ -1,4 +1,7 @@
-from web3_utils.normalize_address import normalize_address
+import pytest
+from web3.exceptions import InvalidAddress
+
+from web3_utils.normalize_address import normalize_address, normalize_addresses
 
 
 def test_normalize_address():
@@ -6,3 +9,45 @@ def test_normalize_address():
 
     normalized_address = normalize_address(raw_address)
     assert normalized_address == "0xC00f6cf15Ab248989838AA01D25177ec2510A81D"
+
+
+def test_normalize_addresses():
+    checksum_address = "0xC00f6cf15Ab248989838AA01D25177ec2510A81D"
+    addresses = [
+        "0xc00f6cf15ab248989838aa01d25177ec2510a81d",
+        "0xC00F6CF15AB248989838AA01D25177EC2510A81D",
+        "c00f6cf15ab248989838aa01d25177ec2510a81d",
+        "0Xc00f6cf15ab248989838aa01d25177ec2510a81d",
+        checksum_address,
+        bytes.fromhex("c00f6cf15ab248989838aa01d25177ec2510a81d"),
+        bytearray.fromhex("c00f6cf15ab248989838aa01d25177ec2510a81d"),
+        memoryview(bytes.fromhex("c00f6cf15ab248989838aa01d25177ec2510a81d")),
+    ]
+
+    assert normalize_addresses(addresses) == [checksum_address] * len(addresses)
+    assert normalize_addresses(["0x" + "00" * 20, "0x" + "ab" * 20]) == [
+        normalize_address("0x" + "00" * 20),
+        normalize_address("0x" + "ab" * 20),
+    ]
+
+
+@pytest.mark.parametrize(
+    "address",
+    [
+        "0xc00F6cf15Ab248989838AA01D25177ec2510A81D",
+        "0xc00f6cf15ab248989838aa01d25177ec2510a81",
+        "0xg00f6cf15ab248989838aa01d25177ec2510a81d",
+        "0XC00f6cf15Ab248989838AA01D25177ec2510A81D",
+        "C00f6cf15Ab248989838AA01D25177ec2510A81D",
+        b"\x00" * 19,
+        bytearray(19),
+        42,
+        ["0xc00f6cf15ab248989838aa01d25177ec2510a81d"],
+    ],
+)
+def test_normalize_addresses_invalid(address):
+    with pytest.raises(InvalidAddress):
+        normalize_addresses([address])
+    # the batch accepts exactly what normalize_address accepts
+    with pytest.raises(InvalidAddress):
+        normalize_address(address)
@@ -0,0 +1,97 @@
+import os
+import time
+
+import pytest
+
+from web3_utils import public_key_index
+from web3_utils.load_public_keys_from_files import load_public_keys_from_files
+from web3_utils.public_key_index import INDEX_FILE_NAME, PublicKeyIndex
+
+
+def pubkey(i: int) -> str:
+    return "0x" + i.to_bytes(48, "big").hex()
+
+
+@pytest.fixture
+def key_dir(tmp_path):
+    (tmp_path / "bulk1-lighthouse0-pubkeys.txt").write_text("\n".join(pubkey(i) for i in range(500, 0, -1)) + "\n")
+    (tmp_path / "nft1-teku0-pubkeys.txt").write_text("\n".join(pubkey(i) for i in range(1000, 1100)) + "\n")
+    return tmp_path
+
+
+def test_lookup(key_dir):
+    with PublicKeyIndex.open(str(key_dir)) as index:
+        assert len(index) == 600
+        assert list(index.keys) == sorted(index.keys)
+        assert pubkey(1) in index and bytes.fromhex(pubkey(1050)[2:]) in index
+        assert pubkey(0) not in index and pubkey(700) not in index and pubkey(2000) not in index
+        assert index.file_name(pubkey(250)) == "bulk1-lighthouse0-pubkeys.txt"
+        assert index.is_type(pubkey(1099), "nft1")
+        assert not index.is_type(pubkey(1099), "bulk1")
+        assert index.file_name(pubkey(700)) is None
+
+
+def test_keys_in_several_files(key_dir):
+    (key_dir / "nft1-teku1-pubkeys.txt").write_text(pubkey(250) + "\n" + pubkey(250) + "\n" + pubkey(1050) + "\n")
+
+    with PublicKeyIndex.open(str(key_dir)) as index:
+        assert len(index) == 602
+        assert pubkey(250) in load_public_keys_from_files("nft1", str(key_dir))
+        assert index.is_type(pubkey(250), "nft1") and index.is_type(pubkey(250), "bulk1")
+        assert index.file_name(pubkey(250)) == "bulk1-lighthouse0-pubkeys.txt"
+        assert index.file_names_of(pubkey(1050)) == ["nft1-teku0-pubkeys.txt", "nft1-teku1-pubkeys.txt"]
+        assert index.file_names_of(pubkey(700)) == []
+
+
+def test_concurrent_builds_use_their_own_files(key_dir, mocker):
+    replace = mocker.spy(public_key_index, "replace")
+    index_path = str(key_dir / INDEX_FILE_NAME)
+
+    PublicKeyIndex.build(str(key_dir), index_path, [])
+    PublicKeyIndex.build(str(key_dir), index_path, [])
+
+    temporary_paths = [call.args[0] for call in replace.call_args_list]
+    assert len(set(temporary_paths)) == 2
+    assert all(os.path.dirname(temporary_path) == str(key_dir) for temporary_path in temporary_paths)
+    assert sorted(os.listdir(key_dir)) == [INDEX_FILE_NAME, "bulk1-lighthouse0-pubkeys.txt", "nft1-teku0-pubkeys.txt"]
+
+
+def test_index_is_rebuilt_only_when_files_change(key_dir, mocker):
+    build = mocker.spy(PublicKeyIndex, "build")
+
+    PublicKeyIndex.open(str(key_dir)).close()
+    PublicKeyIndex.open(str(key_dir)).close()
+    assert build.call_count == 1
+    assert os.path.exists(key_dir / INDEX_FILE_NAME)
+
+    file_path = key_dir / "nft1-teku0-pubkeys.txt"
+    file_path.write_text(pubkey(7777) + "\n")
+    os.utime(file_path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    with PublicKeyIndex.open(str(key_dir)) as index:
+        assert build.call_count == 2
+        assert pubkey(7777) in index and pubkey(1050) not in index
+
+    with PublicKeyIndex.open(str(key_dir), use_hashes=True) as index:
+        assert pubkey(7777) in index
+    PublicKeyIndex.open(str(key_dir), use_hashes=True).close()
+    assert build.call_count == 3
+
+
+def test_corrupted_index_is_rebuilt(key_dir):
+    (key_dir / INDEX_FILE_NAME).write_bytes(b"garbage")
+
+    with PublicKeyIndex.open(str(key_dir)) as index:
+        assert pubkey(1) in index
+
+
+def test_truncated_index_is_rebuilt(key_dir):
+    PublicKeyIndex.open(str(key_dir)).close()
+    index_path = key_dir / INDEX_FILE_NAME
+    index_path.write_bytes(index_path.read_bytes()[:-10])
+
+    with PublicKeyIndex.open(str(key_dir)) as index:
+        assert len(index) == 600
+
+    index_path.write_bytes(b"")
+    with PublicKeyIndex.open(str(key_dir)) as index:
+        assert len(index) == 600
@@ -0,0 +1,82 @@
+import asyncio
+import fcntl
+import os
+import tempfile
+
+import pytest
+from pytest_mock import MockerFixture
+
+from web3_utils.rate_limiter import FileBucketStore, RateLimiter, rate_limit_key
+
+
+def test_rate_limit_key():
+    assert rate_limit_key("http://127.0.0.1:5052/eth/v1/node/syncing") == "127.0.0.1:5052"
+    assert rate_limit_key("https://mainnet.example.com") == "mainnet.example.com"
+
+
+def test_burst_then_rate(mocker: MockerFixture):
+    mocker.patch("web3_utils.rate_limiter.MemoryBucketStore.clock", return_value=100.0)
+    rate_limiter = RateLimiter(rate=10, burst=3)
+
+    assert [rate_limiter.reserve("host") for _ in range(3)] == [0.0, 0.0, 0.0]
+    # waiting callers queue up behind each other
+    assert [round(rate_limiter.reserve("host"), 3) for _ in range(3)] == [0.1, 0.2, 0.3]
+
+
+def test_host_limits(mocker: MockerFixture):
+    now = mocker.patch("web3_utils.rate_limiter.MemoryBucketStore.clock", return_value=100.0)
+    rate_limiter = RateLimiter(rate=1, burst=1, host_limits={"fast": (100, 10)})
+
+    assert rate_limiter.reserve("slow") == 0.0
+    assert rate_limiter.reserve("slow") == 1.0
+    assert all(rate_limiter.reserve("fast") == 0.0 for _ in range(10))
+
+    # tokens are earned back over time, up to the burst size
+    now.return_value = 200.0
+    assert rate_limiter.reserve("slow") == 0.0
+    assert rate_limiter.reserve("slow") == 1.0
+
+
+def test_file_store_is_shared(mocker: MockerFixture):
+    mocker.patch("web3_utils.rate_limiter.FileBucketStore.clock", return_value=100.0)
+    directory = tempfile.mkdtemp()
+
+    # two limiters standing for two worker processes
+    first = RateLimiter(rate=1, burst=2, store=FileBucketStore(directory))
+    second = RateLimiter(rate=1, burst=2, store=FileBucketStore(directory))
+
+    assert first.reserve("node:5052") == 0.0
+    assert second.reserve("node:5052") == 0.0
+    assert first.reserve("node:5052") == 1.0
+    assert second.reserve("node:5052") == 2.0
+
+
+@pytest.mark.asyncio()
+async def test_acquire_sleeps_for_reservation(mocker: MockerFixture):
+    sleep = mocker.patch("web3_utils.rate_limiter.asyncio.sleep")
+    mocker.patch("web3_utils.rate_limiter.MemoryBucketStore.clock", return_value=100.0)
+    rate_limiter = RateLimiter(rate=2, burst=1)
+
+    @rate_limiter.limit("host")
+    async def call():
+        return "result"
+
+    assert await asyncio.gather(call(), call()) == ["result", "result"]
+    sleep.assert_called_once_with(0.5)
+
+
+@pytest.mark.asyncio()
+async def test_acquire_waits_for_the_file_lock_off_the_event_loop(tmp_path):
+    rate_limiter = RateLimiter(rate=1, burst=2, store=FileBucketStore(str(tmp_path)))
+    rate_limiter.reserve("node:5052")
+
+    # another process holding the bucket
+    with open(tmp_path / "node_5052.bucket", "a+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        acquire = asyncio.ensure_future(rate_limiter.acquire("node:5052"))
+        await asyncio.sleep(0.05)
+        assert not acquire.done()
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+    await asyncio.wait_for(acquire, timeout=5)
+    assert os.path.getsize(tmp_path / "node_5052.bucket") == FileBucketStore.BUCKET_STRUCT.size
@@ -0,0 +1,154 @@
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+from pytest_mock import MockerFixture
+from tenacity import RetryError
+
+from web3_utils.retry_policy import CircuitOpenError, RetryPolicy, get_retry_after
+
+
+class RetryableError(Exception):
+    def __init__(self, headers=None):
+        self.headers = headers
+
+
+def is_retryable(e) -> bool:
+    return isinstance(e, RetryableError)
+
+
+def failing(times: int, error=RetryableError):
+    state = {"calls": 0}
+
+    def fun():
+        state["calls"] += 1
+        if state["calls"] <= times:
+            raise error()
+        return state["calls"]
+
+    return fun, state
+
+
+def retry_state(attempt_number: int, exception: BaseException):
+    state = Mock()
+    state.attempt_number = attempt_number
+    state.outcome.failed = True
+    state.outcome.exception.return_value = exception
+    return state
+
+
+def test_full_jitter_exponential_wait():
+    policy = RetryPolicy(initial_wait=1.0, max_wait=8.0)
+
+    for attempt_number, cap in [(1, 1.0), (2, 2.0), (3, 4.0), (10, 8.0)]:
+        waits = [policy.wait(retry_state(attempt_number, RetryableError())) for _ in range(200)]
+        assert all(0 <= wait <= cap for wait in waits)
+        assert max(waits) > cap / 2
+
+
+def test_retry_after_header():
+    policy = RetryPolicy(max_retry_after=60.0)
+
+    assert policy.wait(retry_state(1, RetryableError({"Retry-After": "7"}))) == 7.0
+    assert policy.wait(retry_state(1, RetryableError({"Retry-After": "600"}))) == 60.0
+
+    http_date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < get_retry_after(RetryableError({"Retry-After": http_date})) <= 30
+
+    response_error = Mock(spec=["response"])
+    response_error.response.headers = {"Retry-After": "3"}
+    assert get_retry_after(response_error) == 3.0
+    assert get_retry_after(ValueError()) is None
+
+
+def test_max_attempts(mocker: MockerFixture):
+    mocker.patch.object(RetryPolicy, "wait", return_value=0)
+    policy = RetryPolicy(max_attempts=3)
+    fun, state = failing(times=5)
+
+    with pytest.raises(RetryableError):
+        policy.retrying("key", is_retryable, reraise=True)(fun)()
+    assert state["calls"] == 3
+
+
+def test_retry_budget_is_per_endpoint(mocker: MockerFixture):
+    mocker.patch.object(RetryPolicy, "wait", return_value=0)
+    policy = RetryPolicy(retry_budget=3, retry_budget_window=3600)
+
+    fun, state = failing(times=10)
+    with pytest.raises(RetryError):
+        policy.retrying("exhausted", is_retryable)(fun)()
+    assert state["calls"] == 4
+
+    # the budget is spent, the next call gets no retries at all
+    fun, state = failing(times=1)
+    with pytest.raises(RetryError):
+        policy.retrying("exhausted", is_retryable)(fun)()
+    assert state["calls"] == 1
+
+    fun, state = failing(times=1)
+    assert policy.retrying("other", is_retryable)(fun)() == 2
+
+
+def test_circuit_breaker(mocker: MockerFixture):
+    now = mocker.patch("web3_utils.retry_policy.time.monotonic", return_value=100.0)
+    policy = RetryPolicy(max_attempts=1, failure_threshold=2, reset_timeout=30.0)
+
+    for _ in range(2):
+        fun, _ = failing(times=1)
+        with pytest.raises(RetryableError):
+            policy.retrying("key", is_retryable, reraise=True)(fun)()
+
+    fun, state = failing(times=0)
+    with pytest.raises(CircuitOpenError):
+        policy.retrying("key", is_retryable)(fun)()
+    assert state["calls"] == 0
+
+    # a failed trial after the reset timeout opens the circuit again
+    now.return_value = 131.0
+    fun, _ = failing(times=1)
+    with pytest.raises(RetryableError):
+        policy.retrying("key", is_retryable, reraise=True)(fun)()
+    with pytest.raises(CircuitOpenError):
+        policy.retrying("key", is_retryable)(fun)()
+
+    # a successful trial closes it
+    now.return_value = 162.0
+    fun, _ = failing(times=0)
+    assert policy.retrying("key", is_retryable)(fun)() == 1
+    assert not policy.circuit_breaker("key").is_open
+
+
+@pytest.mark.asyncio()
+async def test_async_functions(mocker: MockerFixture):
+    mocker.patch.object(RetryPolicy, "wait", return_value=0)
+    policy = RetryPolicy(failure_threshold=5)
+    state = {"calls": 0}
+
+    async def fun():
+        state["calls"] += 1
+        await asyncio.sleep(0)
+        if state["calls"] < 3:
+            raise RetryableError()
+        return "done"
+
+    assert await policy.retrying("key", is_retryable)(fun)() == "done"
+    assert state["calls"] == 3
+    assert policy.circuit_breaker("key").failures == 0
+
+
+def test_retry_state_is_only_set_up_after_a_failure(mocker: MockerFixture):
+    mocker.patch.object(RetryPolicy, "wait", return_value=0)
+    policy = RetryPolicy()
+
+    fun, _ = failing(times=0)
+    retried = policy.retrying("key", is_retryable)(fun)
+    assert retried() == 1
+    assert retried.retry.statistics == {}
+
+    fun, _ = failing(times=2)
+    retried = policy.retrying("key", is_retryable)(fun)
+    assert retried() == 3
+    assert retried.retry.statistics["attempt_number"] == 3
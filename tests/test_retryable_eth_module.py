@@ -12,6 +12,8 @@ from web3.exceptions import BlockNotFound, TransactionNotFound
 from web3.main import get_default_modules, Web3
 from web3.types import RPCError
 
+from web3_utils.rate_limiter import RateLimiter
+from web3_utils.retry_policy import RetryPolicy
 from web3_utils.retryable_eth_module import get_retryable_eth_module
 
 
@@ -154,3 +156,55 @@ def test_rpc_timeout_error_retry(mocker):
     web3 = retryable_web3()
     web3.eth.get_block(123)
     mocked_fn.assert_called()
+
+
+def test_retry_policy(mocker):
+    class Resp:
+        status_code = 429
+        headers = {"Retry-After": "0"}
+
+    state = {"counter": 0}
+
+    def mocked_caller(*args):
+        def fun(*args2):
+            state["counter"] += 1
+            raise HTTPError(response=Resp())
+
+        return fun
+
+    mocker.patch("web3.module.retrieve_blocking_method_call_fn", return_value=mocked_caller)
+    web3_modules = get_default_modules()
+    web3_modules["eth"] = get_retryable_eth_module(Eth, logger=logging.getLogger(), retry_policy=RetryPolicy(max_attempts=3))
+    web3 = Web3(HTTPProvider("http://127.0.0.1:8545"), modules=web3_modules)
+
+    with pytest.raises(HTTPError):
+        web3.eth.get_block(123)
+
+    assert state["counter"] == 3
+
+
+def test_rate_limiter(mocker):
+    mocker.patch("web3.module.retrieve_blocking_method_call_fn", return_value=trigger_fake_error(error_to_raise=BlockNotFound()))
+    rate_limiter = RateLimiter(rate=1000, burst=10)
+    acquire = mocker.spy(rate_limiter, "acquire_blocking")
+
+    web3_modules = get_default_modules()
+    web3_modules["eth"] = get_retryable_eth_module(Eth, logger=logging.getLogger(), rate_limiter=rate_limiter)
+    web3 = Web3(HTTPProvider("http://127.0.0.1:8545"), modules=web3_modules)
+    web3.eth.get_block(123)
+
+    # the failed attempt and the retry both took a token
+    assert acquire.call_count == 2
+    acquire.assert_called_with("127.0.0.1:8545")
+
+
+def test_callers_are_prepared_once(mocker):
+    retrieve_caller = MagicMock(side_effect=lambda method: lambda *args: {"number": args[0]})
+    mocker.patch("web3.module.retrieve_blocking_method_call_fn", return_value=retrieve_caller)
+
+    web3 = retryable_web3()
+    assert web3.eth.get_block(1)["number"] == 1
+    assert web3.eth.get_block(2)["number"] == 2
+    web3.eth.get_transaction("0x" + "00" * 32)
+
+    assert retrieve_caller.call_count == 2
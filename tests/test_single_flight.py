@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from web3_utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio()
+async def test_concurrent_calls_share_result():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    results = await asyncio.gather(*[single_flight.do("key", fetch) for _ in range(5)])
+    assert results == [1] * 5
+
+    # a completed call is never reused
+    assert await single_flight.do("key", fetch) == 2
+    assert single_flight.stats() == {"calls": 2, "deduplicated": 4, "in_flight": 0}
+
+
+@pytest.mark.asyncio()
+async def test_concurrent_calls_share_exception():
+    single_flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("Oops")
+
+    results = await asyncio.gather(*[single_flight.do("key", fail) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert results[0] is results[1]
+    assert single_flight.calls == 1
+
+
+@pytest.mark.asyncio()
+async def test_cancelled_caller_does_not_cancel_others():
+    single_flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "value"
+
+    first = asyncio.ensure_future(single_flight.do("key", fetch))
+    second = asyncio.ensure_future(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "value"
@@ -1,7 +1,12 @@
+import pytest
 from eth_typing import HexStr
 
 from web3_utils.is_null_address import is_null_address
-from web3_utils.split_validator_pubkey_bytes import split_validator_pubkey_bytes
+from web3_utils.split_validator_pubkey_bytes import (
+    split_validator_pubkey_bytes,
+    split_validator_pubkey_views,
+    validator_pubkeys_to_hex,
+)
 
 
 def test_split_validator_pubkey_bytes():
@@ -15,3 +20,27 @@ def test_split_validator_pubkey_bytes():
     assert pubkeys[0] == "0x" + VALIDATOR_PUB_KEY_1
     assert pubkeys[1] == "0x" + VALIDATOR_PUB_KEY_2
     assert pubkeys[2] == "0x" + VALIDATOR_PUB_KEY_3
+
+
+def test_split_validator_pubkey_views():
+    pubkey_bytes = bytes(range(48)) + bytes(range(48, 96)) + bytes(range(96, 144))
+
+    views = split_validator_pubkey_views(pubkey_bytes)
+    assert [bytes(view) for view in views] == [bytes(range(48)), bytes(range(48, 96)), bytes(range(96, 144))]
+    assert all(view.obj is pubkey_bytes for view in views)
+
+    # the same keys from hex input, and from a view into larger calldata
+    assert split_validator_pubkey_views("0x" + pubkey_bytes.hex()) == views
+    calldata = b"\x00" * 4 + pubkey_bytes
+    assert split_validator_pubkey_views(memoryview(calldata)[4:]) == views
+
+    assert validator_pubkeys_to_hex(pubkey_bytes) == split_validator_pubkey_bytes(HexStr("0x" + pubkey_bytes.hex()))
+    assert validator_pubkeys_to_hex(views[1:]) == ["0x" + bytes(range(48, 96)).hex(), "0x" + bytes(range(96, 144)).hex()]
+    assert split_validator_pubkey_views(b"") == []
+
+
+def test_split_validator_pubkey_views_rejects_partial_pubkeys():
+    with pytest.raises(ValueError):
+        split_validator_pubkey_views(b"\x00" * 50)
+    with pytest.raises(ValueError):
+        split_validator_pubkey_views("0x" + "11" * 47)
@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+from pytest_mock import MockerFixture
+
+from web3_utils.async_beacon import AsyncBeacon
+from web3_utils.validator_index_resolver import ValidatorIndexResolver
+
+
+def pubkey(i: int) -> str:
+    return "0x" + i.to_bytes(48, "big").hex()
+
+
+def fake_validators_endpoint(known: dict):
+    async def request(method, endpoint, params=None, json_data=None):
+        if json_data is None:
+            return {"data": [{"index": id, "balance": "32000000000"} for id in params["id"]]}
+
+        ids = json_data["ids"]
+        return {
+            "data": [
+                {"index": str(known[id]) if id.startswith("0x") else id, "validator": {"pubkey": id}}
+                for id in ids
+                if id in known or not id.startswith("0x")
+            ]
+        }
+
+    return request
+
+
+@pytest.mark.asyncio()
+async def test_only_unresolved_keys_are_queried(mocker: MockerFixture, tmp_path):
+    known = {pubkey(i): 100 + i for i in range(10)}
+    mocked_fn = mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", side_effect=fake_validators_endpoint(known))
+    beacon = AsyncBeacon("http://localhost:5052", logging.getLogger())
+    file_path = str(tmp_path / "indexes.bin")
+
+    resolver = ValidatorIndexResolver(beacon, file_path, batch_size=4)
+    assert await resolver.resolve([pubkey(i) for i in range(6)] + [pubkey(50)]) == {pubkey(i): 100 + i for i in range(6)}
+    assert mocked_fn.call_count == 2
+    assert mocked_fn.call_args_list[0].args == ("POST", "/eth/v1/beacon/states/finalized/validators")
+
+    mocked_fn.reset_mock()
+    assert await resolver.resolve([pubkey(5), bytes.fromhex(pubkey(6)[2:]), pubkey(50)]) == {pubkey(5): 105, pubkey(6): 106}
+    assert mocked_fn.call_args.kwargs["json_data"]["ids"] == [pubkey(6), pubkey(50)]
+
+    # the map survives restarts
+    mocked_fn.reset_mock()
+    resolver = ValidatorIndexResolver(beacon, file_path)
+    assert len(resolver) == 7
+    assert resolver.get(pubkey(3)) == 103
+    assert await resolver.resolve_indexes([pubkey(0), pubkey(6)]) == ["100", "106"]
+    mocked_fn.assert_not_called()
+
+
+@pytest.mark.asyncio()
+async def test_queries_by_index(mocker: MockerFixture, tmp_path):
+    known = {pubkey(i): i for i in range(3)}
+    mocked_fn = mocker.patch("web3_utils.async_beacon.AsyncBeacon._request", side_effect=fake_validators_endpoint(known))
+    resolver = ValidatorIndexResolver(AsyncBeacon("http://localhost:5052", logging.getLogger()), str(tmp_path / "indexes.bin"))
+
+    response = await resolver.get_validators([pubkey(1), pubkey(2)], state_id="head")
+    assert [validator["index"] for validator in response["data"]] == ["1", "2"]
+    assert mocked_fn.call_args.kwargs["json_data"]["ids"] == ["1", "2"]
+
+    await resolver.get_validator_balances([pubkey(0)])
+    mocked_fn.assert_called_with("GET", "/eth/v1/beacon/states/head/validator_balances", params={"id": ["0"]})
+    assert await resolver.get_validator_balances([pubkey(99)]) == {"data": []}
+
+
+def test_truncated_record_is_dropped(tmp_path):
+    file_path = tmp_path / "indexes.bin"
+    file_path.write_bytes(bytes.fromhex(pubkey(1)[2:]) + (7).to_bytes(8, "little") + b"\x00" * 20)
+
+    resolver = ValidatorIndexResolver(None, str(file_path))
+    assert resolver.indexes == {bytes.fromhex(pubkey(1)[2:]): 7}
+    assert file_path.stat().st_size == 56
@@ -0,0 +1,74 @@
+import pytest
+
+from web3_utils.validator_table import FAR_FUTURE_EPOCH, ValidatorRecord, ValidatorTable
+
+
+def validator(index: int, balance: int, status: str = "active_ongoing"):
+    return {
+        "index": str(index),
+        "balance": str(balance),
+        "status": status,
+        "validator": {
+            "pubkey": "0x" + index.to_bytes(48, "big").hex(),
+            "withdrawal_credentials": "0x" + "0" * 64,
+            "effective_balance": "32000000000",
+            "slashed": status == "active_slashed",
+            "activation_eligibility_epoch": "0",
+            "activation_epoch": "10",
+            "exit_epoch": str(FAR_FUTURE_EPOCH),
+            "withdrawable_epoch": str(FAR_FUTURE_EPOCH),
+        },
+    }
+
+
+def test_lookup_by_index_and_pubkey():
+    table = ValidatorTable.from_response({"data": [validator(index, 32 * 10**9 + index) for index in range(0, 3000, 3)]})
+
+    assert len(table) == 1000
+    assert table.get_by_index(2997) == ValidatorRecord(
+        index=2997,
+        pubkey=(2997).to_bytes(48, "big"),
+        balance=32 * 10**9 + 2997,
+        effective_balance=32 * 10**9,
+        status="active_ongoing",
+        slashed=False,
+        activation_eligibility_epoch=0,
+        activation_epoch=10,
+        exit_epoch=FAR_FUTURE_EPOCH,
+        withdrawable_epoch=FAR_FUTURE_EPOCH,
+    )
+    assert table.row_of_pubkey("0x" + (300).to_bytes(48, "big").hex()) == 100
+    assert table.row_of_pubkey((300).to_bytes(48, "big")) == 100
+    assert table.get_by_index(1) is None
+    assert table.get_by_pubkey((1).to_bytes(48, "big")) is None
+    assert len(table.pubkeys) == 1000 * 48
+
+    with pytest.raises(ValueError):
+        table.append(validator(3, 1))
+
+
+def test_totals_by_status():
+    table = ValidatorTable.from_validators(
+        [validator(0, 10, "active_ongoing"), validator(1, 20, "active_slashed"), validator(2, 30, "active_ongoing")]
+    )
+
+    assert table.total_balance() == 60
+    assert table.total_balance(["active_ongoing"]) == 40
+    assert table.total_balance_by_status()["active_slashed"] == 20
+    assert table.count_by_status()["active_ongoing"] == 2
+    assert table.get_by_index(1).slashed is True
+
+
+def test_diff_balances():
+    previous = ValidatorTable.from_validators([validator(index, 100) for index in range(4)])
+    current = ValidatorTable.from_validators([validator(index, 100 + index) for index in range(5)])
+    current.update_balances([{"index": "0", "balance": "90"}])
+
+    indexes, deltas = current.diff_balances(previous)
+    assert list(indexes) == [0, 1, 2, 3]
+    assert list(deltas) == [-10, 1, 2, 3]
+
+    shuffled = ValidatorTable.from_validators([validator(index, 200) for index in [4, 2, 0]])
+    indexes, deltas = shuffled.diff_balances(previous)
+    assert list(indexes) == [2, 0]
+    assert list(deltas) == [100, 100]
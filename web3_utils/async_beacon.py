@@ -1,84 +1,223 @@
 import asyncio
 import logging
-from typing import Any, Dict, List, Callable
+import re
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Dict, List, Callable, Optional, Tuple
 
-from eth_typing import URI
-from requests import HTTPError, ConnectionError, Session
-from tenacity import retry, retry_if_exception, wait_fixed, before_sleep_log, retry_any, retry_if_exception_type, stop_never
+from aiohttp import ClientConnectionError, ClientResponse, ClientResponseError, ClientSession, ClientTimeout, TCPConnector
+from tenacity import before_sleep_log
 from web3.beacon import Beacon
-from web3._utils.request import json_make_get_request, cache_and_return_session
+from web3.beacon.api_endpoints import GET_FINALITY_CHECKPOINT, GET_GENESIS, GET_SYNCING, GET_VALIDATOR
+
+from web3_utils.beacon_response_cache import BeaconResponseCache, request_cache_key
+from web3_utils.beacon_ssz import (
+    PENDING_CONSOLIDATIONS,
+    PENDING_DEPOSITS,
+    PENDING_PARTIAL_WITHDRAWALS,
+    SSZ_ACCEPT_HEADER,
+    SSZ_CONTENT_TYPE,
+    SszListCodec,
+)
+from web3_utils.divide_chunks import divide_chunks
+from web3_utils.iter_json_array import iter_json_array
+from web3_utils.rate_limiter import RateLimiter, rate_limit_key
+from web3_utils.retry_policy import RetryPolicy
+from web3_utils.single_flight import SingleFlight
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+RETRYABLE_STATUS_CODES = [429, 502, 503, 500]
+
+
+def is_retryable_response_error(e) -> bool:
+    return isinstance(e, ClientResponseError) and e.status in RETRYABLE_STATUS_CODES
+
+
+def is_retryable_beacon_error(e) -> bool:
+    return isinstance(e, (ClientConnectionError, asyncio.TimeoutError)) or is_retryable_response_error(e)
+
+
+def endpoint_retry_key(method: str, endpoint: str) -> str:
+    """
+    Groups requests to the same API endpoint regardless of the state and validator ids in the path
+    """
+    endpoint = re.sub(r"/states/[^/]+", "/states/{state_id}", endpoint)
+    endpoint = re.sub(r"/validators/[^/]+", "/validators/{validator_id}", endpoint)
+    return f"{method} {endpoint}"
 
 
 def with_retry(f):
-    async def wrapper(*args):
-        retry_stop = args[0].retry_stop
-
-        @retry(
-            retry=retry_any(
-                retry_if_exception_type(ConnectionError),
-                retry_if_exception(lambda e: isinstance(e, HTTPError) and e.response.status_code in [429, 502, 503, 500]),
-            ),
-            stop=retry_stop() if retry_stop else stop_never,
-            wait=wait_fixed(5),
-            before_sleep=before_sleep_log(logger=args[0].logger, log_level=logging.WARNING),
-        )
-        async def execute():
-            return await f(*args)
+    """
+    Retries the request under the client's retry policy. The retrying function is built once per client,
+    request function and endpoint retry key, then reused by every request to that endpoint.
+    """
 
-        return await execute()
+    async def wrapper(self, method: str, endpoint: str, *args, **kwargs):
+        key = endpoint_retry_key(method, endpoint)
+        retried = self._retried_requests.get((f, key))
+        if retried is None:
+            retried = self._retried_requests[(f, key)] = self.retry_policy.retrying(
+                key,
+                is_retryable_beacon_error,
+                retry_stop=self.retry_stop,
+                before_sleep=before_sleep_log(logger=self.logger, log_level=logging.WARNING),
+            )(f)
+        return await retried(self, method, endpoint, *args, **kwargs)
 
     return wrapper
 
 
+def encode_query_params(params: Optional[Dict[str, Any]]):
+    """
+    Flattens list values into repeated query params and drops empty ones, the same way requests does
+    """
+    if params is None:
+        return None
+
+    encoded = []
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            encoded.extend((key, str(item)) for item in value)
+        else:
+            encoded.append((key, str(value)))
+
+    return encoded
+
+
+def merge_data_responses(responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merges chunked beacon responses into one, concatenating their "data" arrays
+    """
+    merged = dict(responses[0])
+    merged["data"] = [item for response in responses for item in response["data"]]
+    if "execution_optimistic" in merged:
+        merged["execution_optimistic"] = any(response.get("execution_optimistic", False) for response in responses)
+    if "finalized" in merged:
+        merged["finalized"] = all(response.get("finalized", False) for response in responses)
+
+    return merged
+
+
 class AsyncBeacon(Beacon):
-    def __init__(self, base_url: str, logger: logging.Logger, retry_stop: Callable or None = None):
-        super().__init__(base_url)
+    def __init__(
+        self,
+        base_url: str,
+        logger: logging.Logger,
+        retry_stop: Callable or None = None,
+        request_timeout: float = 10.0,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        max_concurrent_batches: int = 8,
+        ssz: bool = False,
+        response_cache: Optional[BeaconResponseCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        super().__init__(base_url, request_timeout)
         self.retry_stop = retry_stop
+        self.retry_policy = retry_policy or RetryPolicy()
         self.logger = logger
+        self._retried_requests: Dict[Tuple[Callable, str], Callable] = {}
         self.cache = {}
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.max_concurrent_batches = max_concurrent_batches
+        self.ssz = ssz
+        self._ssz_unsupported = set()
+        self.response_cache = response_cache
+        self.single_flight = single_flight
+        self.rate_limiter = rate_limiter
+        self._session: Optional[ClientSession] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def get_syncing(self):
-        return await self._run_as_async(super().get_syncing)
+        return await self._make_get_request_with_params(GET_SYNCING, params=None)
 
     async def get_finality_checkpoint(self, state_id: str = "head"):
-        return await self._run_as_async(super().get_finality_checkpoint, state_id)
+        return await self._make_get_request_with_params(GET_FINALITY_CHECKPOINT.format(state_id), params=None)
 
     async def get_genesis(self) -> int:
         if "genesis_time" not in self.cache:
-            genesis = await self._run_as_async(super().get_genesis)
+            genesis = await self._make_get_request_with_params(GET_GENESIS, params=None)
             self.cache["genesis_time"] = int(genesis["data"]["genesis_time"])
 
         return self.cache["genesis_time"]
 
     async def get_validator(self, pubkey: str, state_id: str = "head"):
-        return await self._run_as_async(self._get_validator, pubkey, state_id)
+        return await self._get_validator(pubkey, state_id)
+
+    async def get_validators(
+        self, state_id: str = "head", ids: List[str] = None, statuses: List[str] = None, batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        if batch_size is None or ids is None or len(ids) <= batch_size:
+            return await self._get_validators(state_id, ids, statuses)
+
+        return await self._get_in_batches(lambda chunk: self._get_validators(state_id, chunk, statuses), ids, batch_size)
+
+    async def get_validator_balances(
+        self, state_id: str = "head", indexes: List[str] = None, batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        if batch_size is None or indexes is None or len(indexes) <= batch_size:
+            return await self._get_validator_balances(state_id, indexes)
+
+        return await self._get_in_batches(lambda chunk: self._get_validator_balances(state_id, chunk), indexes, batch_size)
+
+    async def iter_validators(
+        self, state_id: str = "head", ids: List[str] = None, statuses: List[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields validator records one by one while the response is still being downloaded
+        """
+        request_body = {}
+        if ids is not None:
+            request_body["ids"] = ids
+        if statuses is not None:
+            request_body["statuses"] = statuses
 
-    async def get_validators(self, state_id: str = "head", ids: List[str] = None, statuses: List[str] = None) -> Dict[str, Any]:
-        return await self._run_as_async(self._get_validators, state_id, ids, statuses)
+        response = await self._open_stream("POST", f"/eth/v1/beacon/states/{state_id}/validators", json_data=request_body)
+        async for validator in self._iter_response_data(response):
+            yield validator
 
-    async def get_validator_balances(self, state_id: str = "head", indexes: List[str] = None) -> Dict[str, Any]:
-        return await self._run_as_async(self._get_validator_balances, state_id, indexes)
+    async def iter_validator_balances(self, state_id: str = "head", indexes: List[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        response = await self._open_stream("GET", f"/eth/v1/beacon/states/{state_id}/validator_balances", params={"id": indexes})
+        async for balance in self._iter_response_data(response):
+            yield balance
 
     async def get_pending_consolidations(self, state_id: str = "head"):
-        return await self._run_as_async(self._get_pending_consolidations, state_id)
+        return await self._get_pending_consolidations(state_id)
 
     async def get_pending_deposits(self, state_id: str = "head"):
-        return await self._run_as_async(self._get_pending_deposits, state_id)
+        return await self._get_pending_deposits(state_id)
 
     async def get_pending_partial_withdrawals(self, state_id: str = "head"):
-        return await self._run_as_async(self._get_pending_partial_withdrawals, state_id)
+        return await self._get_pending_partial_withdrawals(state_id)
 
-    def _get_validator(self, pubkey: str, state_id: str = "head"):
+    async def _get_validator(self, pubkey: str, state_id: str = "head"):
         try:
-            return super().get_validator(pubkey, state_id)
-        except HTTPError as e:
-            if e.response.status_code == 404:
+            return await self._make_get_request_with_params(GET_VALIDATOR.format(state_id, pubkey), params=None)
+        except ClientResponseError as e:
+            if e.status == 404:
                 self.logger.info(f"BEACON CHAIN: Validator {pubkey} was not found, probably is not active yet | State: {state_id}")
                 return None
             else:
                 raise e
 
-    def _get_validators(self, state_id: str = "head", ids: List[str] = None, statuses: List[str] = None) -> Dict[str, Any]:
+    async def _get_validators(self, state_id: str = "head", ids: List[str] = None, statuses: List[str] = None) -> Dict[str, Any]:
         endpoint = f"/eth/v1/beacon/states/{state_id}/validators"
 
         request_body = {}
@@ -87,38 +226,172 @@ class AsyncBeacon(Beacon):
         if statuses is not None:
             request_body["statuses"] = statuses
 
-        return self._make_post_request(endpoint, request_body)
+        return await self._make_post_request(endpoint, request_body)
 
-    def _get_validator_balances(self, state_id: str = "head", indexes: List[str] = None) -> Dict[str, Any]:
+    async def _get_validator_balances(self, state_id: str = "head", indexes: List[str] = None) -> Dict[str, Any]:
         endpoint = f"/eth/v1/beacon/states/{state_id}/validator_balances"
         params = {"id": indexes}
 
-        return self._make_get_request_with_params(endpoint, params)
+        return await self._make_get_request_with_params(endpoint, params)
+
+    async def _get_in_batches(self, fetch_chunk: Callable, ids: List[str], batch_size: int) -> Dict[str, Any]:
+        """
+        Fetches ids chunk by chunk with at most max_concurrent_batches requests in flight.
+        Every chunk goes through its own retry loop, so a failed chunk doesn't re-fetch the others.
+        Once a chunk fails for good, the chunks still running or waiting are cancelled and its error is raised.
+        Use a fixed state_id (slot, root or finalized) to get a consistent view across chunks.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+
+        async def fetch(chunk: List[str]):
+            async with semaphore:
+                return await fetch_chunk(chunk)
+
+        tasks = [asyncio.ensure_future(fetch(chunk)) for chunk in divide_chunks(ids, batch_size)]
+        try:
+            if tasks:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            # also reached when the caller is cancelled
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        errors = [task.exception() for task in tasks if not task.cancelled() and task.exception() is not None]
+        if errors:
+            raise errors[0]
 
-    def _get_pending_consolidations(self, state_id: str = "head"):
+        return merge_data_responses([task.result() for task in tasks])
+
+    async def _get_pending_consolidations(self, state_id: str = "head"):
         endpoint = f"/eth/v1/beacon/states/{state_id}/pending_consolidations"
-        return self._make_get_request_with_params(endpoint, params=None)
+        if self.ssz:
+            return await self._make_ssz_request("GET", endpoint, PENDING_CONSOLIDATIONS)
+        return await self._make_get_request_with_params(endpoint, params=None)
 
-    def _get_pending_deposits(self, state_id: str = "head"):
+    async def _get_pending_deposits(self, state_id: str = "head"):
         endpoint = f"/eth/v1/beacon/states/{state_id}/pending_deposits"
-        return self._make_get_request_with_params(endpoint, params=None)
+        if self.ssz:
+            return await self._make_ssz_request("GET", endpoint, PENDING_DEPOSITS)
+        return await self._make_get_request_with_params(endpoint, params=None)
 
-    def _get_pending_partial_withdrawals(self, state_id: str = "head"):
+    async def _get_pending_partial_withdrawals(self, state_id: str = "head"):
         endpoint = f"/eth/v1/beacon/states/{state_id}/pending_partial_withdrawals"
-        return self._make_get_request_with_params(endpoint, params=None)
+        if self.ssz:
+            return await self._make_ssz_request("GET", endpoint, PENDING_PARTIAL_WITHDRAWALS)
+        return await self._make_get_request_with_params(endpoint, params=None)
+
+    async def _make_get_request_with_params(self, endpoint: str, params: Any) -> Dict[str, Any]:
+        return await self._fetch("GET", endpoint, params=params)
+
+    async def _make_post_request(self, endpoint: str, json_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._fetch("POST", endpoint, json_data=json_data)
+
+    async def _fetch(self, method: str, endpoint: str, **request_kwargs) -> Dict[str, Any]:
+        ttl = self.response_cache.ttl(endpoint) if self.response_cache is not None else None
+        if ttl is not None:
+            return await self.response_cache.get_or_fetch(
+                request_cache_key(method, endpoint, request_kwargs),
+                ttl,
+                lambda: self._request_with_retry(method, endpoint, **request_kwargs),
+            )
+
+        if self.single_flight is not None:
+            return await self.single_flight.do(
+                request_cache_key(method, endpoint, request_kwargs),
+                lambda: self._request_with_retry(method, endpoint, **request_kwargs),
+            )
+
+        return await self._request_with_retry(method, endpoint, **request_kwargs)
+
+    @with_retry
+    async def _request_with_retry(self, method: str, endpoint: str, **request_kwargs) -> Dict[str, Any]:
+        return await self._request(method, endpoint, **request_kwargs)
+
+    @with_retry
+    async def _make_ssz_request(self, method: str, endpoint: str, codec: SszListCodec) -> Dict[str, Any]:
+        """
+        Negotiates SSZ and decodes both SSZ and JSON answers into the codec records.
+        Endpoints rejecting SSZ with 406 are remembered per node and requested as JSON from that node on.
+        """
+        base_url = self._select_base_url()
+        if (base_url, codec) not in self._ssz_unsupported:
+            await self._acquire_rate_limit(base_url)
+            async with self._get_session().request(method, base_url + endpoint, headers={"Accept": SSZ_ACCEPT_HEADER}) as response:
+                if response.status != HTTPStatus.NOT_ACCEPTABLE:
+                    response.raise_for_status()
+                    if response.content_type == SSZ_CONTENT_TYPE:
+                        return codec.decode_response(await response.read(), response.headers)
+                    return codec.from_json_response(await response.json(content_type=None))
+
+            self.logger.info(f"BEACON CHAIN: SSZ is not supported for {endpoint} by {base_url}, falling back to JSON")
+            self._ssz_unsupported.add((base_url, codec))
 
-    def _make_get_request_with_params(self, endpoint: str, params: Any) -> Dict[str, Any]:
-        uri = URI(self.base_url + endpoint)
-        return json_make_get_request(uri, timeout=self.request_timeout, params=params)
+        return codec.from_json_response(await self._request(method, endpoint))
 
-    def _make_post_request(self, endpoint: str, json_data: Dict[str, Any]) -> Dict[str, Any]:
-        uri = self.base_url + endpoint
-        session = cache_and_return_session(uri)
-        response = session.post(uri, json=json_data)
-        response.raise_for_status()
-        return response.json()
+    async def _request(self, method: str, endpoint: str, params: Any = None, json_data: Any = None) -> Dict[str, Any]:
+        return await self._request_to(self.base_url, method, endpoint, params=params, json_data=json_data)
+
+    async def _request_to(
+        self, base_url: str, method: str, endpoint: str, params: Any = None, json_data: Any = None
+    ) -> Dict[str, Any]:
+        await self._acquire_rate_limit(base_url)
+        session = self._get_session()
+        async with session.request(method, base_url + endpoint, params=encode_query_params(params), json=json_data) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
 
     @with_retry
-    async def _run_as_async(self, func, *args):
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, func, *args)
+    async def _open_stream(self, method: str, endpoint: str, params: Any = None, json_data: Any = None) -> ClientResponse:
+        """
+        Only opening the response is retried, a stream that already yielded items can't be restarted transparently
+        """
+        base_url = self._select_base_url()
+        await self._acquire_rate_limit(base_url)
+        session = self._get_session()
+        response = await session.request(
+            method,
+            base_url + endpoint,
+            params=encode_query_params(params),
+            json=json_data,
+        )
+        try:
+            response.raise_for_status()
+        except ClientResponseError:
+            response.release()
+            raise
+
+        return response
+
+    async def _iter_response_data(self, response: ClientResponse) -> AsyncIterator[Any]:
+        try:
+            async for item in iter_json_array(response.content.iter_chunked(STREAM_CHUNK_SIZE)):
+                yield item
+        finally:
+            response.release()
+
+    def _select_base_url(self) -> str:
+        return self.base_url
+
+    async def _acquire_rate_limit(self, base_url: str):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(rate_limit_key(base_url))
+
+    def _get_session(self) -> ClientSession:
+        """
+        Lazily creates one pooled session per client, so keep-alive connections are reused across calls.
+        `request_timeout` bounds connecting and every read, not the whole request, so large responses
+        that keep arriving never time out.
+        """
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            timeout = ClientTimeout(total=None, sock_connect=self.request_timeout, sock_read=self.request_timeout)
+            self._session = ClientSession(connector=connector, timeout=timeout)
+
+        return self._session
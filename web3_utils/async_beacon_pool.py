@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from aiohttp import ClientConnectionError, ClientResponseError
+from web3.beacon.api_endpoints import GET_SYNCING
+
+from web3_utils.async_beacon import AsyncBeacon
+
+
+def is_failover_error(e) -> bool:
+    """Errors that say nothing about the request itself, so another node may answer it"""
+    return isinstance(e, (ClientConnectionError, asyncio.TimeoutError)) or (isinstance(e, ClientResponseError) and e.status >= 500)
+
+
+class BeaconNode:
+    def __init__(self, url: str, ewma_alpha: float, latency_samples: int):
+        self.url = url
+        self.ewma_alpha = ewma_alpha
+        self.ewma_latency: Optional[float] = None
+        self.latencies = deque(maxlen=latency_samples)
+        self.healthy = True
+        self.failed_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def is_available(self, now: float) -> bool:
+        return self.healthy and now >= self.failed_until
+
+    def record_latency(self, latency: float):
+        self.latencies.append(latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = self.ewma_alpha * latency + (1 - self.ewma_alpha) * self.ewma_latency
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+
+class AsyncBeaconPool(AsyncBeacon):
+    """
+    AsyncBeacon spread over several beacon nodes. Every request goes to the available node with the lowest
+    EWMA latency and fails over to the next one on connection errors, timeouts and 5xx responses.
+    Failing nodes sit out for `failure_cooldown` seconds, nodes reported as syncing by check_health until
+    the next check. With `hedge_percentile` set, a request still running after that latency percentile of
+    its node is also sent to the second best node and the first answer wins.
+    Streams and SSZ requests go to the best node without failover.
+    """
+
+    def __init__(
+        self,
+        base_urls: List[str],
+        logger: logging.Logger,
+        retry_stop: Callable or None = None,
+        ewma_alpha: float = 0.3,
+        failure_cooldown: float = 5.0,
+        hedge_percentile: Optional[float] = None,
+        latency_samples: int = 100,
+        **kwargs,
+    ):
+        if not base_urls:
+            raise ValueError("AsyncBeaconPool needs at least one beacon node url")
+
+        super().__init__(base_urls[0], logger, retry_stop, **kwargs)
+        self.nodes = [BeaconNode(url, ewma_alpha, latency_samples) for url in base_urls]
+        self.failure_cooldown = failure_cooldown
+        self.hedge_percentile = hedge_percentile
+        self.hedged_requests = 0
+
+    def ranked_nodes(self) -> List[BeaconNode]:
+        """
+        Available nodes by EWMA latency, nodes without samples first so they get measured.
+        Falls back to all nodes when none is available.
+        """
+        now = time.monotonic()
+        nodes = [node for node in self.nodes if node.is_available(now)] or self.nodes
+        return sorted(nodes, key=lambda node: -1.0 if node.ewma_latency is None else node.ewma_latency)
+
+    async def check_health(self) -> Dict[str, bool]:
+        """
+        Probes every node's syncing endpoint, nodes that are syncing, have their EL offline or don't answer are unhealthy
+        """
+
+        async def probe(node: BeaconNode):
+            try:
+                syncing = (await self._request_node(node, "GET", GET_SYNCING))["data"]
+                node.healthy = not syncing["is_syncing"] and not syncing.get("el_offline", False)
+            except Exception as e:
+                self.logger.warning(f"BEACON CHAIN: Health check of {node.url} failed: {e.__class__.__name__}: {e}")
+                node.healthy = False
+
+        await asyncio.gather(*[probe(node) for node in self.nodes])
+        return {node.url: node.healthy for node in self.nodes}
+
+    async def run_health_checks(self, interval: float = 12.0):
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def _request(self, method: str, endpoint: str, params: Any = None, json_data: Any = None) -> Dict[str, Any]:
+        nodes = self.ranked_nodes()
+        request_kwargs = {"params": params, "json_data": json_data}
+        last_error = None
+
+        if self.hedge_percentile is not None and len(nodes) > 1:
+            try:
+                return await self._hedged_request(nodes[0], nodes[1], method, endpoint, **request_kwargs)
+            except Exception as e:
+                if not is_failover_error(e):
+                    raise
+                last_error = e
+                nodes = nodes[2:]
+
+        for node in nodes:
+            try:
+                return await self._request_node(node, method, endpoint, **request_kwargs)
+            except Exception as e:
+                if not is_failover_error(e):
+                    raise
+                self.logger.warning(f"BEACON CHAIN: {node.url} failed with {e.__class__.__name__}: {e}, failing over")
+                last_error = e
+
+        raise last_error
+
+    async def _hedged_request(self, primary: BeaconNode, secondary: BeaconNode, method: str, endpoint: str, **request_kwargs):
+        tasks = [asyncio.ensure_future(self._request_node(primary, method, endpoint, **request_kwargs))]
+        try:
+            delay = primary.latency_percentile(self.hedge_percentile)
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done or (tasks[0].exception() is not None and is_failover_error(tasks[0].exception())):
+                if done:
+                    self.logger.warning(f"BEACON CHAIN: {primary.url} failed, failing over to {secondary.url}")
+                else:
+                    self.hedged_requests += 1
+                tasks.append(asyncio.ensure_future(self._request_node(secondary, method, endpoint, **request_kwargs)))
+
+            last_error = None
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except Exception as e:
+                    if not is_failover_error(e):
+                        raise
+                    last_error = e
+
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _request_node(self, node: BeaconNode, method: str, endpoint: str, **request_kwargs) -> Dict[str, Any]:
+        node.requests += 1
+        started_at = time.monotonic()
+        try:
+            response = await self._request_to(node.url, method, endpoint, **request_kwargs)
+        except Exception as e:
+            if is_failover_error(e):
+                node.failures += 1
+                node.failed_until = time.monotonic() + self.failure_cooldown
+            raise
+
+        node.record_latency(time.monotonic() - started_at)
+        return response
+
+    def _select_base_url(self) -> str:
+        return self.ranked_nodes()[0].url
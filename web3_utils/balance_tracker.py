@@ -0,0 +1,166 @@
+import asyncio
+import struct
+import time
+from array import array
+from operator import sub
+from os import path
+from typing import Dict, Iterable, List, Optional
+
+from web3_utils.async_beacon import AsyncBeacon
+from web3_utils.compute_time_at_slot import SECONDS_PER_SLOT, SLOTS_PER_EPOCH, compute_time_at_slot
+from web3_utils.single_flight import SingleFlight
+
+MAGIC = b"BALS"
+VERSION = 1
+# magic, version, validator count
+HEADER = struct.Struct("<4sIQ")
+EPOCH = struct.Struct("<Q")
+# balance of validators missing from a response, e.g. not deposited yet at that epoch
+MISSING_BALANCE = -1
+
+
+class BalanceTracker:
+    """
+    Balance history of a fixed list of validators, one int64 column per epoch.
+
+    Columns are appended to `file_path` as an epoch number followed by one balance per validator, in the order
+    of `indexes`, so the history survives restarts and epochs can be added in any order. Balances are fetched
+    at the first slot of each epoch by slot number. Backfills only fetch the epochs the file doesn't hold yet,
+    `max_concurrency` at a time, and concurrent fetches of the same epoch share one request.
+    """
+
+    def __init__(
+        self,
+        beacon: AsyncBeacon,
+        indexes: Iterable[int],
+        file_path: str,
+        max_concurrency: int = 4,
+        batch_size: Optional[int] = 1000,
+        slots_per_epoch: int = SLOTS_PER_EPOCH,
+    ):
+        self.beacon = beacon
+        self.indexes = array("Q", indexes)
+        self.file_path = file_path
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.slots_per_epoch = slots_per_epoch
+        self.columns: Dict[int, array] = {}
+        self._positions = {index: position for position, index in enumerate(self.indexes)}
+        self._single_flight = SingleFlight()
+        self._load()
+
+    @property
+    def epochs(self) -> List[int]:
+        return sorted(self.columns)
+
+    def balances(self, epoch: int) -> array:
+        return self.columns[epoch]
+
+    def deltas(self, from_epoch: int, to_epoch: int) -> array:
+        """
+        Balance change of every validator between two epochs, 0 where either balance is missing
+        """
+        before, after = self.columns[from_epoch], self.columns[to_epoch]
+        deltas = array("q", map(sub, after, before))
+        if MISSING_BALANCE in before or MISSING_BALANCE in after:
+            for position, (balance_before, balance_after) in enumerate(zip(before, after)):
+                if balance_before == MISSING_BALANCE or balance_after == MISSING_BALANCE:
+                    deltas[position] = 0
+
+        return deltas
+
+    def total_balance(self, epoch: int) -> int:
+        column = self.columns[epoch]
+        return sum(column) - MISSING_BALANCE * column.count(MISSING_BALANCE)
+
+    def total_delta(self, from_epoch: int, to_epoch: int) -> int:
+        return sum(self.deltas(from_epoch, to_epoch))
+
+    async def fetch_epoch(self, epoch: int) -> array:
+        if epoch in self.columns:
+            return self.columns[epoch]
+
+        return await self._single_flight.do(epoch, lambda: self._fetch_epoch(epoch))
+
+    async def _fetch_epoch(self, epoch: int) -> array:
+        state_id = str(epoch * self.slots_per_epoch)
+        response = await self.beacon.get_validator_balances(
+            state_id, indexes=[str(index) for index in self.indexes], batch_size=self.batch_size
+        )
+
+        column = array("q", [MISSING_BALANCE]) * len(self.indexes)
+        for item in response["data"]:
+            position = self._positions.get(int(item["index"]))
+            if position is not None:
+                column[position] = int(item["balance"])
+
+        self._append(epoch, column)
+        return column
+
+    async def backfill(self, start_epoch: int, end_epoch: int) -> List[int]:
+        """
+        Fetches the missing epochs from `start_epoch` to `end_epoch` inclusive and returns them
+        """
+        missing_epochs = [epoch for epoch in range(start_epoch, end_epoch + 1) if epoch not in self.columns]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(epoch: int):
+            async with semaphore:
+                await self.fetch_epoch(epoch)
+
+        await asyncio.gather(*[fetch(epoch) for epoch in missing_epochs])
+        return missing_epochs
+
+    async def run(self, genesis_time: int, start_epoch: Optional[int] = None, delay: float = 4.0):
+        """
+        Fetches every epoch `delay` seconds after its first slot, backfilling from `start_epoch` first
+        """
+        epoch_seconds = SECONDS_PER_SLOT * self.slots_per_epoch
+        current_epoch = int(time.time() - genesis_time) // epoch_seconds
+        if start_epoch is not None:
+            await self.backfill(start_epoch, current_epoch)
+
+        epoch = current_epoch + 1
+        while True:
+            await asyncio.sleep(max(0.0, compute_time_at_slot(genesis_time, epoch * self.slots_per_epoch) + delay - time.time()))
+            end_epoch = int(time.time() - genesis_time) // epoch_seconds
+            try:
+                await self.backfill(epoch, end_epoch)
+            except Exception as e:
+                self.beacon.logger.warning(f"BEACON CHAIN: Fetching balances of epoch {epoch} failed: {e.__class__.__name__}: {e}")
+                await asyncio.sleep(SECONDS_PER_SLOT)
+                continue
+            # a sleep ending a bit early leaves end_epoch short of epoch, which is then waited for again
+            epoch = max(epoch, end_epoch + 1)
+
+    def _load(self):
+        if not path.exists(self.file_path):
+            with open(self.file_path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, len(self.indexes)))
+                f.write(self.indexes.tobytes())
+            return
+
+        with open(self.file_path, "rb") as f:
+            data = f.read()
+
+        magic, version, count = HEADER.unpack_from(data) if len(data) >= HEADER.size else (b"", 0, 0)
+        stored_indexes = array("Q", data[HEADER.size : HEADER.size + 8 * count])
+        if magic != MAGIC or version != VERSION or stored_indexes != self.indexes:
+            raise ValueError(f"{self.file_path} holds balances of a different validator list, track them in a new file")
+
+        column_size = EPOCH.size + 8 * count
+        offset = HEADER.size + 8 * count
+        while offset + column_size <= len(data):
+            (epoch,) = EPOCH.unpack_from(data, offset)
+            self.columns[epoch] = array("q", data[offset + EPOCH.size : offset + column_size])
+            offset += column_size
+
+        if offset != len(data):
+            # a column cut short by a crash while appending
+            with open(self.file_path, "r+b") as f:
+                f.truncate(offset)
+
+    def _append(self, epoch: int, column: array):
+        with open(self.file_path, "ab") as f:
+            f.write(EPOCH.pack(epoch) + column.tobytes())
+        self.columns[epoch] = column
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from array import array
+from typing import AsyncIterator, Callable, Iterable, Union
+
+from web3_utils.async_beacon import AsyncBeacon
+from web3_utils.compute_time_at_slot import SECONDS_PER_SLOT, SLOTS_PER_EPOCH
+
+Numbers = Union[range, Iterable[int]]
+
+
+class BeaconClock:
+    """
+    Converts between timestamps, slots and epochs for a chain, one value at a time or over whole ranges
+    and arrays, and wakes up async consumers at slot or epoch boundaries.
+    Spec constants default to mainnet and can be set for other networks.
+    """
+
+    def __init__(
+        self,
+        genesis_time: int,
+        seconds_per_slot: int = SECONDS_PER_SLOT,
+        slots_per_epoch: int = SLOTS_PER_EPOCH,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.genesis_time = genesis_time
+        self.seconds_per_slot = seconds_per_slot
+        self.slots_per_epoch = slots_per_epoch
+        self.clock = clock
+
+    @classmethod
+    async def from_beacon(cls, beacon: AsyncBeacon, **kwargs) -> "BeaconClock":
+        return cls(await beacon.get_genesis(), **kwargs)
+
+    def time_at_slot(self, slot: int) -> int:
+        return self.genesis_time + slot * self.seconds_per_slot
+
+    def slot_at(self, timestamp: float) -> int:
+        return int((timestamp - self.genesis_time) // self.seconds_per_slot)
+
+    def epoch_at_slot(self, slot: int) -> int:
+        return slot // self.slots_per_epoch
+
+    def start_slot_of_epoch(self, epoch: int) -> int:
+        return epoch * self.slots_per_epoch
+
+    def time_at_epoch(self, epoch: int) -> int:
+        return self.time_at_slot(epoch * self.slots_per_epoch)
+
+    def epoch_at(self, timestamp: float) -> int:
+        return self.slot_at(timestamp) // self.slots_per_epoch
+
+    def current_slot(self) -> int:
+        return self.slot_at(self.clock())
+
+    def current_epoch(self) -> int:
+        return self.epoch_at(self.clock())
+
+    def times_at_slots(self, slots: Numbers) -> Union[range, array]:
+        """Ranges map to ranges without materializing them, other iterables to arrays"""
+        if isinstance(slots, range):
+            return range(self.time_at_slot(slots.start), self.time_at_slot(slots.stop), slots.step * self.seconds_per_slot)
+
+        genesis_time, seconds_per_slot = self.genesis_time, self.seconds_per_slot
+        return array("q", [genesis_time + slot * seconds_per_slot for slot in slots])
+
+    def slots_at(self, timestamps: Iterable[float]) -> array:
+        genesis_time, seconds_per_slot = self.genesis_time, self.seconds_per_slot
+        return array("q", [int((timestamp - genesis_time) // seconds_per_slot) for timestamp in timestamps])
+
+    def epochs_at_slots(self, slots: Numbers) -> array:
+        slots_per_epoch = self.slots_per_epoch
+        return array("q", [slot // slots_per_epoch for slot in slots])
+
+    def start_slots_of_epochs(self, epochs: Numbers) -> Union[range, array]:
+        if isinstance(epochs, range):
+            return range(
+                epochs.start * self.slots_per_epoch, epochs.stop * self.slots_per_epoch, epochs.step * self.slots_per_epoch
+            )
+
+        slots_per_epoch = self.slots_per_epoch
+        return array("q", [epoch * slots_per_epoch for epoch in epochs])
+
+    async def ticks(self, per_epoch: bool = False, offset: float = 0.0) -> AsyncIterator[int]:
+        """
+        Yields every slot, or every epoch with `per_epoch`, `offset` seconds after it starts. Sleeps until exactly
+        that moment instead of polling. Boundaries that passed while the consumer was busy are skipped.
+        """
+        seconds_per_tick = self.seconds_per_slot * (self.slots_per_epoch if per_epoch else 1)
+        tick = None
+        while True:
+            now = self.clock()
+            upcoming = int((now - offset - self.genesis_time) // seconds_per_tick) + 1
+            tick = upcoming if tick is None else max(tick + 1, upcoming)
+            await asyncio.sleep(self.genesis_time + tick * seconds_per_tick + offset - now)
+            yield tick
@@ -0,0 +1,95 @@
+import json
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional
+
+from web3.beacon.api_endpoints import GET_GENESIS
+
+from web3_utils.single_flight import SingleFlight
+
+STATE_ENDPOINT = re.compile(r"^/eth/v\d+/beacon/states/([^/]+)/")
+HEAD_STATE_IDS = ("head", "justified")
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    expires_at: float
+
+
+def request_cache_key(method: str, endpoint: str, request_kwargs: Dict[str, Any]) -> Hashable:
+    return method, endpoint, json.dumps(request_kwargs, sort_keys=True)
+
+
+class BeaconResponseCache:
+    """
+    Bounded LRU cache of beacon API responses keyed by request, with a lifetime derived from the requested state:
+    slot numbers, state roots and genesis never change, head/justified expire after `head_ttl` and
+    the finalized alias after `finalized_ttl`. Other endpoints are not cached.
+    Concurrent misses for the same request share a single fetch.
+    Cached responses are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024, head_ttl: float = 1.0, finalized_ttl: float = 12.0):
+        self.max_entries = max_entries
+        self.head_ttl = head_ttl
+        self.finalized_ttl = finalized_ttl
+        self.hits = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._single_flight = SingleFlight()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl(self, endpoint: str) -> Optional[float]:
+        if endpoint == GET_GENESIS:
+            return math.inf
+
+        match = STATE_ENDPOINT.match(endpoint)
+        if match is None:
+            return None
+
+        state_id = match.group(1)
+        if state_id.isdigit() or state_id.startswith("0x") or state_id == "genesis":
+            return math.inf
+        if state_id == "finalized":
+            return self.finalized_ttl
+        if state_id in HEAD_STATE_IDS:
+            return self.head_ttl
+
+        return None
+
+    @property
+    def misses(self) -> int:
+        return self._single_flight.calls
+
+    @property
+    def coalesced(self) -> int:
+        return self._single_flight.deduplicated
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "entries": len(self._entries)}
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_fetch(self, key: Hashable, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            del self._entries[key]
+
+        return await self._single_flight.do(key, lambda: self._fetch_and_store(key, ttl, fetch))
+
+    async def _fetch_and_store(self, key: Hashable, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = await fetch()
+
+        self._entries[key] = CacheEntry(value, time.monotonic() + ttl)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return value
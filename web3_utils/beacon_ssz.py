@@ -0,0 +1,81 @@
+import struct
+from typing import Any, Dict, List, Mapping, NamedTuple, Tuple, Type
+
+SSZ_CONTENT_TYPE = "application/octet-stream"
+SSZ_ACCEPT_HEADER = "application/octet-stream;q=1.0,application/json;q=0.9"
+
+
+class PendingDeposit(NamedTuple):
+    pubkey: bytes
+    withdrawal_credentials: bytes
+    amount: int
+    signature: bytes
+    slot: int
+
+
+class PendingPartialWithdrawal(NamedTuple):
+    validator_index: int
+    amount: int
+    withdrawable_epoch: int
+
+
+class PendingConsolidation(NamedTuple):
+    source_index: int
+    target_index: int
+
+
+class SszListCodec:
+    """
+    Decodes SSZ lists of fixed-size containers, and their JSON representation, into the same NamedTuple records
+    """
+
+    def __init__(self, record_type: Type[NamedTuple], field_formats: List[Tuple[str, str]]):
+        if [name for name, _ in field_formats] != list(record_type._fields):
+            raise ValueError(f"Field formats don't match {record_type.__name__} fields")
+
+        self.record_type = record_type
+        self.field_formats = field_formats
+        # SSZ is little-endian and containers of fixed-size fields have no padding
+        self.record_struct = struct.Struct("<" + "".join(field_format for _, field_format in field_formats))
+
+    def decode(self, payload: bytes) -> list:
+        if len(payload) % self.record_struct.size != 0:
+            raise ValueError(
+                f"SSZ payload of {len(payload)} bytes is not a list of {self.record_struct.size} byte {self.record_type.__name__}"
+            )
+
+        return [self.record_type._make(fields) for fields in self.record_struct.iter_unpack(payload)]
+
+    def encode(self, records: list) -> bytes:
+        return b"".join(self.record_struct.pack(*record) for record in records)
+
+    def from_json(self, item: Mapping[str, Any]):
+        return self.record_type._make(
+            bytes.fromhex(item[name][2:]) if field_format.endswith("s") else int(item[name])
+            for name, field_format in self.field_formats
+        )
+
+    def decode_response(self, payload: bytes, headers: Mapping[str, str]) -> Dict[str, Any]:
+        """
+        Builds the same response shape as the JSON API, the metadata is sent in Eth-* headers along SSZ payloads
+        """
+        return {
+            "version": headers.get("Eth-Consensus-Version"),
+            "execution_optimistic": headers.get("Eth-Execution-Optimistic") == "true",
+            "finalized": headers.get("Eth-Consensus-Finalized") == "true",
+            "data": self.decode(payload),
+        }
+
+    def from_json_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        return {**response, "data": [self.from_json(item) for item in response["data"]]}
+
+
+PENDING_DEPOSITS = SszListCodec(
+    PendingDeposit,
+    [("pubkey", "48s"), ("withdrawal_credentials", "32s"), ("amount", "Q"), ("signature", "96s"), ("slot", "Q")],
+)
+PENDING_PARTIAL_WITHDRAWALS = SszListCodec(
+    PendingPartialWithdrawal,
+    [("validator_index", "Q"), ("amount", "Q"), ("withdrawable_epoch", "Q")],
+)
+PENDING_CONSOLIDATIONS = SszListCodec(PendingConsolidation, [("source_index", "Q"), ("target_index", "Q")])
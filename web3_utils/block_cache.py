@@ -0,0 +1,245 @@
+import asyncio
+import json
+import pickle
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+MISSING = object()
+HASH_HEX_LENGTH = 66
+CONFIRMED_NUMBER_KEY = "confirmed_number"
+
+
+def to_hex_key(value) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    return str(value).lower()
+
+
+def is_block_hash(block_identifier) -> bool:
+    return isinstance(block_identifier, (bytes, bytearray)) or (
+        isinstance(block_identifier, str) and len(block_identifier) == HASH_HEX_LENGTH
+    )
+
+
+class MemoryBlockStore:
+    """LRU of cache entries in this process, each entry is tagged with the block number it belongs to"""
+
+    # lookups and updates are a few dict operations
+    blocking = False
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[int], Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, block_number: Optional[int], value: Any):
+        self._entries[key] = (block_number, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete_above(self, block_number: int) -> int:
+        keys = [key for key, (number, _) in self._entries.items() if number is not None and number > block_number]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+
+class SqliteBlockStore:
+    """
+    Cache entries in an SQLite file, so confirmed blocks survive restarts. Values are pickled,
+    the file must only be shared with trusted processes.
+
+    Writes are committed together at most every `commit_interval` seconds instead of one fsync per entry,
+    the entries of the last interval are lost on a crash and simply fetched again. Reorg deletions
+    are committed right away.
+    """
+
+    # queries, pickling and commits block, so BlockCache runs them off the event loop on a single worker thread
+    blocking = True
+
+    def __init__(self, file_path: str, commit_interval: float = 1.0):
+        # the connection is used by BlockCache's worker thread, which serializes all calls
+        self.connection = sqlite3.connect(file_path, check_same_thread=False)
+        self.commit_interval = commit_interval
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, block_number INTEGER, value BLOB NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entries_block_number ON entries (block_number)")
+        self.connection.commit()
+        self._committed_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> Any:
+        row = self.connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        return MISSING if row is None else pickle.loads(row[0])
+
+    def put(self, key: str, block_number: Optional[int], value: Any):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO entries (key, block_number, value) VALUES (?, ?, ?)",
+            (key, block_number, pickle.dumps(value)),
+        )
+        if time.monotonic() - self._committed_at >= self.commit_interval:
+            self.flush()
+
+    def delete_above(self, block_number: int) -> int:
+        deleted = self.connection.execute("DELETE FROM entries WHERE block_number > ?", (block_number,)).rowcount
+        self.flush()
+        return deleted
+
+    def flush(self):
+        self.connection.commit()
+        self._committed_at = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+
+class BlockCache:
+    """
+    Cache of blocks, transaction receipts and logs for the retryable AsyncEth module.
+
+    Blocks are kept by hash, with an index from numbers to hashes. Every block passing through is checked
+    against the cached blocks next to it: when its parent hash or its own hash doesn't match what is cached,
+    the chain reorganized and all entries above the last confirmed block are dropped. Blocks `confirmations` deep
+    under the highest block seen, or under the last finalized block seen, are confirmed and never dropped.
+    Logs are only cached for a block hash, or for block ranges that are confirmed.
+    Tags such as "latest" are always fetched, but their blocks are used to follow the head.
+    Blocks fetched by hash can be uncles or reorged out, so they're only cached under their hash
+    and don't take part in following the chain.
+    With a blocking store, every store access of the async methods runs on one worker thread, in call order.
+    """
+
+    def __init__(self, confirmations: int = 64, store: MemoryBlockStore or SqliteBlockStore or None = None):
+        self.confirmations = confirmations
+        self.store = store if store is not None else MemoryBlockStore()
+        self.head_number: Optional[int] = None
+        # confirmed blocks of a previous run stay confirmed
+        stored_confirmed_number = self.store.get(CONFIRMED_NUMBER_KEY)
+        self.finalized_number: Optional[int] = None if stored_confirmed_number is MISSING else stored_confirmed_number
+        self.hits = 0
+        self.misses = 0
+        self.reorgs = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="block-cache") if self.store.blocking else None
+
+    @property
+    def confirmed_number(self) -> int:
+        """Highest block number treated as immutable, -1 while no block was seen"""
+        by_depth = self.head_number - self.confirmations if self.head_number is not None else -1
+        return max(by_depth, self.finalized_number if self.finalized_number is not None else -1)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "reorgs": self.reorgs, "entries": len(self.store)}
+
+    def observe_block(self, block, block_identifier=None):
+        """
+        Follows the head and detects reorgs from a canonical block, fetched by number or tag with or without the cache
+        """
+        number, block_hash = block["number"], to_hex_key(block["hash"])
+        cached_hash = self.store.get(f"number:{number}")
+        parent_hash = self.store.get(f"number:{number - 1}")
+        if (cached_hash is not MISSING and cached_hash != block_hash) or (
+            parent_hash is not MISSING and parent_hash != to_hex_key(block["parentHash"])
+        ):
+            self.reorgs += 1
+            self.store.delete_above(self.confirmed_number)
+
+        if block_identifier == "finalized" and number > (self.finalized_number or -1):
+            self.finalized_number = number
+            self.store.put(CONFIRMED_NUMBER_KEY, None, self.confirmed_number)
+        if self.head_number is None or number > self.head_number:
+            self.head_number = number
+            self.store.put(CONFIRMED_NUMBER_KEY, None, self.confirmed_number)
+
+        self.store.put(f"number:{number}", number, block_hash)
+
+    async def get_block(self, fetch: Callable[..., Awaitable[Any]], block_identifier, full_transactions: bool = False):
+        if isinstance(block_identifier, int):
+            block_hash = await self._run(self.store.get, f"number:{block_identifier}")
+        elif is_block_hash(block_identifier):
+            block_hash = to_hex_key(block_identifier)
+        else:
+            # "latest", "finalized" and other tags move
+            block = await fetch(block_identifier, full_transactions)
+            await self._run(self._store_block, block, full_transactions, block_identifier)
+            return block
+
+        if block_hash is not MISSING:
+            block = await self._run(self.store.get, f"block:{block_hash}:{full_transactions}")
+            if block is not MISSING:
+                self.hits += 1
+                return block
+
+        self.misses += 1
+        block = await fetch(block_identifier, full_transactions)
+        await self._run(self._store_block, block, full_transactions, block_identifier)
+        return block
+
+    async def get_transaction_receipt(self, fetch: Callable[..., Awaitable[Any]], transaction_hash):
+        key = f"receipt:{to_hex_key(transaction_hash)}"
+        receipt = await self._run(self.store.get, key)
+        if receipt is not MISSING:
+            self.hits += 1
+            return receipt
+
+        self.misses += 1
+        receipt = await fetch(transaction_hash)
+        await self._run(self.store.put, key, receipt["blockNumber"], receipt)
+        return receipt
+
+    async def get_logs(self, fetch: Callable[..., Awaitable[Any]], filter_params: Dict[str, Any]):
+        block_number = self._logs_block_number(filter_params)
+        if block_number is MISSING:
+            return await fetch(filter_params)
+
+        key = f"logs:{json.dumps(filter_params, sort_keys=True, default=to_hex_key)}"
+        logs = await self._run(self.store.get, key)
+        if logs is not MISSING:
+            self.hits += 1
+            return logs
+
+        self.misses += 1
+        logs = await fetch(filter_params)
+        await self._run(self.store.put, key, block_number, logs)
+        return logs
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        if self._executor is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _logs_block_number(self, filter_params: Dict[str, Any]) -> Any:
+        """Block number to tag cached logs with, None for logs that never change, MISSING for logs not to cache"""
+        if "blockHash" in filter_params:
+            # the logs of a block hash don't change, even when the block is reorged out
+            return None
+
+        to_block = filter_params.get("toBlock", "latest")
+        if isinstance(to_block, int) and to_block <= self.confirmed_number:
+            return to_block
+
+        return MISSING
+
+    def _store_block(self, block, full_transactions: bool, block_identifier):
+        if block is None:
+            return
+
+        if not is_block_hash(block_identifier):
+            self.observe_block(block, block_identifier)
+        self.store.put(f"block:{to_hex_key(block['hash'])}:{full_transactions}", block["number"], block)
@@ -1,9 +1,15 @@
+import asyncio
+
 from web3 import Web3
 
 
 async def calculate_max_tx_fees(async_web3: Web3):
-    latest_block = await async_web3.eth.get_block("latest")
-    max_priority_fee_per_gas = await async_web3.eth.max_priority_fee
+    """
+    Fetches the latest block and the max priority fee concurrently, use FeeOracle to share the estimate between calls
+    """
+    latest_block, max_priority_fee_per_gas = await asyncio.gather(
+        async_web3.eth.get_block("latest"), async_web3.eth.max_priority_fee
+    )
     max_fee_per_gas = max_priority_fee_per_gas + (2 * latest_block["baseFeePerGas"])
 
     return max_fee_per_gas, max_priority_fee_per_gas
@@ -1,4 +1,5 @@
 SECONDS_PER_SLOT = 12
+SLOTS_PER_EPOCH = 32
 
 
 def compute_time_at_slot(genesis_time: int, slot: int):
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from web3 import Web3
+
+from web3_utils.single_flight import SingleFlight
+
+
+class Fees(NamedTuple):
+    block_number: int
+    base_fee_per_gas: int
+    max_fee_per_gas: int
+    max_priority_fee_per_gas: int
+
+
+def median(values) -> int:
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2] if ordered else 0
+
+
+class FeeOracle:
+    """
+    Shares fee estimates between transaction senders: max priority fee plus twice the latest base fee,
+    the same estimate calculate_max_tx_fees makes, fetched once per block.
+
+    Without following heads, an estimate is reused for `max_age` seconds. While run_polling or run_subscription
+    follow the chain, it's reused until a new head arrives and is refreshed right away for that head.
+    With `priority_fee_percentile` set, the priority fee is the median of that reward percentile over the last
+    `fee_history_blocks` blocks from eth_feeHistory, instead of eth_maxPriorityFeePerGas.
+    Concurrent callers share a single refresh.
+    """
+
+    def __init__(
+        self,
+        async_web3: Web3,
+        logger: Optional[logging.Logger] = None,
+        max_age: float = 1.0,
+        priority_fee_percentile: Optional[float] = None,
+        fee_history_blocks: int = 10,
+    ):
+        self.async_web3 = async_web3
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_age = max_age
+        self.priority_fee_percentile = priority_fee_percentile
+        self.fee_history_blocks = fee_history_blocks
+        self.fees: Optional[Fees] = None
+        self.fetched_at = 0.0
+        self.head_number: Optional[int] = None
+        self.following = False
+        self.hits = 0
+        self._single_flight = SingleFlight()
+
+    @property
+    def refreshes(self) -> int:
+        return self._single_flight.calls
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "refreshes": self.refreshes, "coalesced": self._single_flight.deduplicated}
+
+    async def get_fees(self) -> Fees:
+        fees = self.fees
+        if fees is not None and self._is_current(fees):
+            self.hits += 1
+            return fees
+
+        return await self._single_flight.do("fees", self.refresh)
+
+    async def get_max_tx_fees(self) -> Tuple[int, int]:
+        """Drop-in for calculate_max_tx_fees: (max_fee_per_gas, max_priority_fee_per_gas)"""
+        fees = await self.get_fees()
+        return fees.max_fee_per_gas, fees.max_priority_fee_per_gas
+
+    async def refresh(self, head: Optional[Dict[str, Any]] = None) -> Fees:
+        """
+        Fetches the latest fees, or the fees on top of `head` when a new head header is already known
+        """
+        if self.priority_fee_percentile is not None:
+            fee_history = await self.async_web3.eth.fee_history(
+                self.fee_history_blocks, head["number"] if head else "latest", [self.priority_fee_percentile]
+            )
+            block_number = fee_history["oldestBlock"] + len(fee_history["reward"]) - 1
+            # baseFeePerGas also holds the base fee of the next block, the last one is the newest block's own
+            base_fee_per_gas = fee_history["baseFeePerGas"][-2]
+            max_priority_fee_per_gas = median(rewards[0] for rewards in fee_history["reward"] if rewards)
+        else:
+            if head is None:
+                head, max_priority_fee_per_gas = await asyncio.gather(
+                    self.async_web3.eth.get_block("latest"), self.async_web3.eth.max_priority_fee
+                )
+            else:
+                max_priority_fee_per_gas = await self.async_web3.eth.max_priority_fee
+            block_number, base_fee_per_gas = head["number"], head["baseFeePerGas"]
+
+        fees = Fees(block_number, base_fee_per_gas, max_priority_fee_per_gas + 2 * base_fee_per_gas, max_priority_fee_per_gas)
+        if self.fees is None or fees.block_number >= self.fees.block_number:
+            self.fees = fees
+            self.fetched_at = time.monotonic()
+        return fees
+
+    async def run_polling(self, poll_interval: float = 1.0):
+        """
+        Follows heads by polling eth_blockNumber
+        """
+        self.following = True
+        try:
+            while True:
+                try:
+                    block_number = await self.async_web3.eth.block_number
+                    if self.head_number is None or block_number > self.head_number:
+                        self.head_number = block_number
+                        await self._single_flight.do("fees", self.refresh)
+                except Exception as e:
+                    self.logger.warning(f"FEE ORACLE: Polling failed with {e.__class__.__name__}: {e}")
+                await asyncio.sleep(poll_interval)
+        finally:
+            self.following = False
+
+    async def run_subscription(self):
+        """
+        Follows heads through eth_subscribe("newHeads"), `async_web3` has to use a persistent connection provider
+        """
+        subscription_id = await self.async_web3.eth.subscribe("newHeads")
+        self.following = True
+        try:
+            async for message in self.async_web3.ws.process_subscriptions():
+                if message.get("subscription") != subscription_id:
+                    continue
+
+                head = message["result"]
+                self.head_number = head["number"]
+                try:
+                    await self._single_flight.do(("head", head["number"]), lambda: self.refresh(head))
+                except Exception as e:
+                    self.logger.warning(f"FEE ORACLE: Refreshing fees failed with {e.__class__.__name__}: {e}")
+        finally:
+            self.following = False
+
+    def _is_current(self, fees: Fees) -> bool:
+        if self.following and self.head_number is not None:
+            return fees.block_number >= self.head_number
+        return time.monotonic() - self.fetched_at < self.max_age
@@ -1,5 +1,34 @@
+from functools import lru_cache
+from typing import Iterable, List, Union
+
+from eth_hash.auto import keccak
 from web3 import Web3
 
+EVENT_PARAM_CACHE_SIZE = 65536
+
 
 def hash_event_param(param: str):
     return str(Web3.to_hex(Web3.solidity_keccak(["bytes"], [param])))
+
+
+def hash_event_params(params: Iterable[Union[str, bytes]], memoize: bool = True) -> List[str]:
+    """
+    Batch hash_event_param: keccak of the raw bytes without ABI encoding dispatch, the result can be passed
+    as a topic of get_logs filters to match any of the values. With `memoize`, the last EVENT_PARAM_CACHE_SIZE
+    distinct values are cached, so pubkeys filtered on again are not hashed again.
+    """
+    hash_param = _hash_event_param_cached if memoize else _hash_event_param
+    return [hash_param(bytes(param) if isinstance(param, (bytearray, memoryview)) else param) for param in params]
+
+
+def _hash_event_param(param: Union[str, bytes]) -> str:
+    if isinstance(param, str):
+        if not param.startswith("0x"):
+            raise ValueError(f"Event param must be bytes or a 0x-prefixed hex string, got {param}")
+        # an odd number of digits is left-padded, the same as solidity_keccak does
+        digits = param[2:]
+        param = bytes.fromhex("0" + digits if len(digits) % 2 else digits)
+    return "0x" + keccak(param).hex()
+
+
+_hash_event_param_cached = lru_cache(maxsize=EVENT_PARAM_CACHE_SIZE)(_hash_event_param)
@@ -0,0 +1,128 @@
+import codecs
+import json
+from typing import Any, AsyncIterator, Optional
+
+JSON_DECODER = json.JSONDecoder()
+SEPARATORS = ", \t\n\r"
+
+
+class ArrayStartScanner:
+    """
+    Finds where the `key` array of the top-level object starts, fed one piece of text at a time.
+    Nested values and string contents are skipped, so only a member of the top-level object matches.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.expect_key = False
+        # raw characters of the top-level member key being read
+        self.key_chars: Optional[list] = None
+        self.member_key: Optional[str] = None
+        self.value_key: Optional[str] = None
+
+    def feed(self, text: str) -> Optional[int]:
+        """Position right after the opening bracket of the array in `text`, or None when it's not there yet"""
+        for position, char in enumerate(text):
+            if self.in_string:
+                if self.key_chars is not None:
+                    self.key_chars.append(char)
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.key_chars is not None:
+                        self.member_key = json.loads('"' + "".join(self.key_chars))
+                        self.key_chars = None
+                continue
+
+            if char in " \t\n\r":
+                continue
+
+            # set by the colon before this value, for the first character of the value only
+            is_value_of_key = self.depth == 1 and self.value_key == self.key
+            self.value_key = None
+
+            if char == '"':
+                self.in_string = True
+                if self.depth == 1 and self.expect_key:
+                    self.key_chars = []
+                    self.expect_key = False
+            elif char in "{[":
+                if char == "[" and is_value_of_key:
+                    return position + 1
+                self.depth += 1
+                self.expect_key = self.depth == 1 and char == "{"
+            elif char in "}]":
+                self.depth -= 1
+            elif self.depth == 1 and char == ",":
+                self.expect_key = True
+            elif self.depth == 1 and char == ":":
+                self.value_key = self.member_key
+
+        return None
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes], key: str = "data") -> AsyncIterator[Any]:
+    """
+    Incrementally decodes the items of the `key` array of a JSON object read as a stream of byte chunks.
+    Only the item being decoded and the unread part of the current chunk are kept in memory.
+    The chunk iterator is closed once the array ends or the caller stops reading.
+    """
+    utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+    array_start = ArrayStartScanner(key)
+    chunk_iterator = chunks.__aiter__()
+    buffer = ""
+    position = None
+    eof = False
+
+    try:
+        while True:
+            if position is None:
+                start = array_start.feed(buffer)
+                if start is not None:
+                    buffer = buffer[start:]
+                    position = 0
+                    continue
+                buffer = ""
+            else:
+                while position < len(buffer) and buffer[position] in SEPARATORS:
+                    position += 1
+
+                if position < len(buffer):
+                    if buffer[position] == "]":
+                        return
+
+                    try:
+                        item, end = JSON_DECODER.raw_decode(buffer, position)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    else:
+                        # an item touching the end of the buffer (e.g. a number) may continue in the next chunk
+                        if end < len(buffer) or eof:
+                            yield item
+                            position = end
+                            continue
+
+                buffer = buffer[position:]
+                position = 0
+
+            if eof:
+                raise ValueError(f'JSON stream ended before the "{key}" array was closed')
+
+            try:
+                chunk = await chunk_iterator.__anext__()
+            except StopAsyncIteration:
+                eof = True
+                buffer += utf8_decoder.decode(b"", final=True)
+            else:
+                buffer += utf8_decoder.decode(chunk)
+    finally:
+        aclose = getattr(chunk_iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -0,0 +1,162 @@
+import inspect
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from web3._utils.encoding import FriendlyJsonSerde, Web3JsonEncoder
+from web3._utils.request import async_make_post_request, make_post_request
+from web3.manager import RequestManager
+from web3.method import Method
+from web3.module import apply_result_formatters
+
+from web3_utils.divide_chunks import divide_chunks
+
+
+class BatchEntriesFailed(Exception):
+    """Raised when some entries of a batch failed with retryable errors, only those are sent again"""
+
+    def __init__(self, errors: List[BaseException]):
+        super().__init__(f"{len(errors)} batch entries failed, first error: {errors[0].__class__.__name__}: {errors[0]}")
+        self.errors = errors
+
+
+class BatchEntry:
+    def __init__(self, request_id: int, method_str: str, params: Any, response_formatters: tuple):
+        self.request_id = request_id
+        self.method_str = method_str
+        self.params = params
+        self.result_formatters, self.error_formatters, self.null_result_formatters = response_formatters
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+    def to_rpc_request(self) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "method": self.method_str, "params": self.params, "id": self.request_id}
+
+    def resolve(self, response: Dict[str, Any]):
+        """
+        Applies the same validation and formatters web3 applies to single calls, provider middlewares are skipped
+        """
+        try:
+            result = RequestManager.formatted_response(response, self.params, self.error_formatters, self.null_result_formatters)
+            self.result = apply_result_formatters(self.result_formatters, result)
+            self.error = None
+            self.done = True
+        except Exception as e:
+            self.error = e
+
+
+class JsonRpcBatch:
+    """
+    Collects calls of an Eth module and sends them as JSON-RPC batch arrays of up to `batch_size` calls per POST.
+    Responses are matched to the calls by id. Retries only resend calls that failed with retryable errors.
+    Provider middlewares are not applied to batched calls.
+    """
+
+    def __init__(
+        self,
+        module,
+        batch_size: int = 100,
+        retrying: Optional[Callable] = None,
+        is_retryable: Callable[[BaseException], bool] = lambda e: False,
+        rate_limited: Callable = lambda fn: fn,
+    ):
+        self.module = module
+        self.batch_size = batch_size
+        self.retrying = retrying
+        self.is_retryable = is_retryable
+        self.rate_limited = rate_limited
+        self.entries: List[BatchEntry] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, method_name: str, *args, **kwargs) -> int:
+        """
+        Queues `module.<method_name>(*args, **kwargs)` and returns its position in the results
+        """
+        method = self._lookup_method(method_name)
+        (method_str, params), response_formatters = method.process_params(self.module, *args, **kwargs)
+        self.entries.append(BatchEntry(len(self.entries), method_str, params, response_formatters))
+        return len(self.entries) - 1
+
+    def _lookup_method(self, method_name: str) -> Method:
+        # public Eth methods wrap private Method descriptors, e.g. get_block -> _get_block, get_transaction_receipt -> _transaction_receipt
+        for name in (method_name, f"_{method_name}", f"_{method_name.removeprefix('get_')}"):
+            method = inspect.getattr_static(self.module, name, None)
+            if isinstance(method, Method):
+                return method
+
+        raise ValueError(f"{method_name} is not an RPC method of {self.module.__class__.__name__}")
+
+    def execute(self, return_exceptions: bool = False) -> List[Any]:
+        self._run(self.retrying(self._send_pending) if self.retrying else self._send_pending)
+        return self._results(return_exceptions)
+
+    def _run(self, send: Callable):
+        try:
+            send()
+        except BatchEntriesFailed:
+            pass
+
+    def _pending_chunks(self) -> List[List[BatchEntry]]:
+        return divide_chunks([entry for entry in self.entries if not entry.done], self.batch_size)
+
+    def _encode(self, chunk: List[BatchEntry]) -> bytes:
+        return FriendlyJsonSerde().json_encode([entry.to_rpc_request() for entry in chunk], cls=Web3JsonEncoder).encode()
+
+    def _demultiplex(self, chunk: List[BatchEntry], raw_response: bytes):
+        responses = json.loads(raw_response)
+        if isinstance(responses, dict):
+            # some providers answer a whole batch with a single error object
+            responses = [{**responses, "id": entry.request_id} for entry in chunk]
+
+        by_id = {response.get("id"): response for response in responses}
+        for entry in chunk:
+            response = by_id.get(entry.request_id)
+            if response is None:
+                entry.error = ValueError(f"request failed or timed out: no response for batch entry {entry.request_id}")
+            else:
+                entry.resolve(response)
+
+    def _raise_retryable_failures(self):
+        errors = [entry.error for entry in self.entries if not entry.done and self.is_retryable(entry.error)]
+        if errors:
+            raise BatchEntriesFailed(errors)
+
+    def _send_pending(self):
+        provider = self.module.w3.provider
+        post = self.rate_limited(make_post_request)
+        for chunk in self._pending_chunks():
+            raw_response = post(provider.endpoint_uri, self._encode(chunk), **provider.get_request_kwargs())
+            self._demultiplex(chunk, raw_response)
+
+        self._raise_retryable_failures()
+
+    def _results(self, return_exceptions: bool) -> List[Any]:
+        if not return_exceptions:
+            for entry in self.entries:
+                if not entry.done:
+                    raise entry.error
+
+        return [entry.result if entry.done else entry.error for entry in self.entries]
+
+
+class AsyncJsonRpcBatch(JsonRpcBatch):
+    async def execute(self, return_exceptions: bool = False) -> List[Any]:
+        await self._run(self.retrying(self._send_pending) if self.retrying else self._send_pending)
+        return self._results(return_exceptions)
+
+    async def _run(self, send: Callable):
+        try:
+            await send()
+        except BatchEntriesFailed:
+            pass
+
+    async def _send_pending(self):
+        provider = self.module.w3.provider
+        post = self.rate_limited(async_make_post_request)
+        for chunk in self._pending_chunks():
+            raw_response = await post(provider.endpoint_uri, self._encode(chunk), **provider.get_request_kwargs())
+            self._demultiplex(chunk, raw_response)
+
+        self._raise_retryable_failures()
@@ -1,5 +1,10 @@
+import binascii
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from os import path, listdir, getcwd
-from typing import TypedDict
+from typing import Iterator, Optional, TypedDict, Union
+
+from web3_utils.validator_table import PUBKEY_SIZE, pubkey_to_bytes
 
 
 def read_public_keys_from_file(file_path: str):
@@ -28,15 +33,111 @@ class PublicKeyFile(TypedDict):
 
 
 # Seperate function introduced that returns the pubkeys on a per file basis as to not break existing code that uses the previous function
-def load_public_key_files(type: str, dir_path: str = path.join(getcwd(), "tmp", "public_keys")) -> list[PublicKeyFile]:
-    files = listdir(dir_path)
-    public_key_files: list[PublicKeyFile] = []
+def load_public_key_files(
+    type: str,
+    dir_path: str = path.join(getcwd(), "tmp", "public_keys"),
+    parallel: bool = False,
+    max_workers: Optional[int] = None,
+    use_processes: bool = False,
+) -> list[PublicKeyFile]:
+    """
+    Files are parsed one after the other unless `parallel` is set, then by a thread pool, or by a process pool
+    with `use_processes`. Parsing is mostly bound by the GIL and processes pickle every key back,
+    see scripts/benchmark_load_public_key_files.py before turning either on. The records are in file name order.
+    """
+    files = sorted(file for file in listdir(dir_path) if file.startswith(type))
+    file_paths = [path.join(dir_path, file) for file in files]
 
-    for file in files:
+    if parallel and len(files) > 1:
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=max_workers) as executor:
+            public_keys_per_file = list(executor.map(read_public_keys_from_file, file_paths))
+    else:
+        public_keys_per_file = [read_public_keys_from_file(file_path) for file_path in file_paths]
+
+    return [
+        # strip file extension
+        {"public_keys": public_keys, "file_name": file.split(".")[0], "type": type}
+        for file, public_keys in zip(files, public_keys_per_file)
+    ]
+
+
+def iter_public_keys_from_file(file_path: str) -> Iterator[bytes]:
+    """
+    Streams the pubkeys of a file as raw 48-byte keys, blank lines are skipped and invalid lines raise ValueError
+    """
+    with open(file_path, "rb") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            hex_key = line[2:] if line[:2] in (b"0x", b"0X") else line
+            try:
+                pubkey = binascii.unhexlify(hex_key)
+            except binascii.Error:
+                pubkey = None
+            if pubkey is None or len(pubkey) != PUBKEY_SIZE:
+                raise ValueError(f"{file_path}:{line_number}: invalid validator pubkey {line[:100]!r}")
+
+            yield pubkey
+
+
+class PublicKeyStore:
+    """
+    Pubkeys packed 48 bytes per key in one bytearray, each with the id of the file it was first found in.
+    Keys found again, in the same or another file, are counted as duplicates and not stored twice.
+    """
+
+    def __init__(self):
+        self.pubkeys = bytearray()
+        self.file_ids = array("I")
+        self.file_names: list[str] = []
+        self.duplicates = 0
+        self._seen: set[bytes] = set()
+
+    def __len__(self) -> int:
+        return len(self.file_ids)
+
+    def __contains__(self, pubkey: Union[str, bytes]) -> bool:
+        return pubkey_to_bytes(pubkey) in self._seen
+
+    def add(self, pubkey: bytes, file_id: int) -> bool:
+        if pubkey in self._seen:
+            self.duplicates += 1
+            return False
+
+        self._seen.add(pubkey)
+        self.pubkeys += pubkey
+        self.file_ids.append(file_id)
+        return True
+
+    def add_file(self, file_path: str, file_name: Optional[str] = None) -> int:
+        """Adds the keys of a file, returns how many were new"""
+        file_id = len(self.file_names)
+        self.file_names.append(file_name or path.basename(file_path).split(".")[0])
+        return sum(self.add(pubkey, file_id) for pubkey in iter_public_keys_from_file(file_path))
+
+    def pubkey(self, position: int) -> memoryview:
+        return memoryview(self.pubkeys)[position * PUBKEY_SIZE : (position + 1) * PUBKEY_SIZE]
+
+    def file_name(self, position: int) -> str:
+        return self.file_names[self.file_ids[position]]
+
+    def iter_hex(self) -> Iterator[str]:
+        """0x-prefixed pubkeys, created one at a time on demand"""
+        for position in range(len(self)):
+            yield "0x" + self.pubkey(position).hex()
+
+
+def load_public_key_store(type: str, dir_path: str = path.join(getcwd(), "tmp", "public_keys")) -> PublicKeyStore:
+    """
+    Memory-lean alternative to load_public_key_files: streams the files starting with `type`, in name order,
+    into a PublicKeyStore
+    """
+    store = PublicKeyStore()
+    for file in sorted(listdir(dir_path)):
         if file.startswith(type):
-            file_name = file.split(".")[0]  # strip file extension
-            file_path = path.join(dir_path, file)
-            public_keys = read_public_keys_from_file(file_path)
-            public_key_files.append({"public_keys": public_keys, "file_name": file_name, "type": type})
+            store.add_file(path.join(dir_path, file))
 
-    return public_key_files
+    return store
@@ -1,10 +1,62 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List, Union
+
+from eth_hash.auto import keccak
 from eth_typing import ChecksumAddress, HexStr
 from web3 import Web3
 from web3.exceptions import InvalidAddress
 
+ADDRESS_SIZE = 20
+ADDRESS_CACHE_SIZE = 65536
+HEX_ADDRESS = re.compile(r"(0[xX])?[0-9a-fA-F]{40}")
+
 
 def normalize_address(address: str) -> ChecksumAddress:
     if Web3.is_address(address) == False:
         raise InvalidAddress(address)
 
     return Web3.to_checksum_address(HexStr(address))
+
+
+def normalize_addresses(addresses: Iterable[Union[str, bytes]]) -> List[ChecksumAddress]:
+    """
+    Batch normalize_address: hex strings, or raw 20-byte addresses, checksummed with a single keccak each.
+    The last ADDRESS_CACHE_SIZE distinct addresses are memoized, so addresses repeated across logs are hashed once.
+    """
+    return [_normalize_address(_cache_key(address)) for address in addresses]
+
+
+def _cache_key(address) -> Union[str, bytes]:
+    if isinstance(address, (bytearray, memoryview)):
+        return bytes(address)
+    # anything else, unhashable values included, is rejected like Web3.is_address does
+    if not isinstance(address, (str, bytes)):
+        raise InvalidAddress(address)
+    return address
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _normalize_address(address: Union[str, bytes]) -> ChecksumAddress:
+    if isinstance(address, bytes):
+        if len(address) != ADDRESS_SIZE:
+            raise InvalidAddress(address)
+        return _checksum(address.hex())
+
+    if HEX_ADDRESS.fullmatch(address) is None:
+        raise InvalidAddress(address)
+
+    digits = address[-40:]
+    lower_digits = digits.lower()
+    checksum_address = _checksum(lower_digits)
+    # mixed case is only accepted when it's already the right 0x-prefixed checksum, like Web3.is_address does
+    if digits != lower_digits and digits != digits.upper() and address != checksum_address:
+        raise InvalidAddress(address)
+    return checksum_address
+
+
+def _checksum(lower_digits: str) -> ChecksumAddress:
+    address_hash = keccak(lower_digits.encode()).hex()
+    return ChecksumAddress(
+        "0x" + "".join(digit.upper() if nibble in "89abcdef" else digit for digit, nibble in zip(lower_digits, address_hash))
+    )
@@ -0,0 +1,185 @@
+import bisect
+import hashlib
+import json
+import mmap
+import struct
+import tempfile
+from array import array
+from os import path, listdir, getcwd, remove, replace, stat
+from typing import Optional, Union
+
+from web3_utils.load_public_keys_from_files import iter_public_keys_from_file
+from web3_utils.validator_table import PUBKEY_SIZE, pubkey_to_bytes
+
+INDEX_FILE_NAME = ".pubkey_index"
+MAGIC = b"PKIX"
+VERSION = 2
+# magic, version, entry count, metadata length
+HEADER = struct.Struct("<4sIQI")
+
+
+def source_files(dir_path: str) -> list[str]:
+    return sorted(file for file in listdir(dir_path) if not file.startswith(".") and not file.endswith(".part"))
+
+
+def fingerprint(dir_path: str, use_hashes: bool = False) -> list:
+    """
+    Identifies the state of the key files: names, sizes and modification times, or content hashes with `use_hashes`
+    """
+    result = []
+    for file in source_files(dir_path):
+        file_path = path.join(dir_path, file)
+        if use_hashes:
+            with open(file_path, "rb") as f:
+                result.append([file, hashlib.blake2b(f.read(), digest_size=16).hexdigest()])
+        else:
+            file_stat = stat(file_path)
+            result.append([file, file_stat.st_size, file_stat.st_mtime_ns])
+    return result
+
+
+class SortedKeys:
+    """Sequence view of the sorted keys in the mapped index, for bisect"""
+
+    def __init__(self, buffer, offset: int, count: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int) -> bytes:
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+
+        start = self.offset + position * PUBKEY_SIZE
+        return self.buffer[start : start + PUBKEY_SIZE]
+
+
+class PublicKeyIndex:
+    """
+    Compiled index of the key files in a directory: the sorted 48-byte keys followed by the id of the file
+    each key came from, memory-mapped read-only so lookups are O(log n) binary searches without parsing anything
+    and worker processes share the same pages. open() rebuilds the index when the key files changed.
+    A key listed in several files has one entry per file, so type lookups agree with load_public_keys_from_files.
+
+    Layout: header, JSON metadata (source fingerprint and file names), keys sorted by key and file id, uint32 file ids.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        with open(index_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, metadata_length = (
+            HEADER.unpack_from(self._mmap) if len(self._mmap) >= HEADER.size else (b"", 0, 0, 0)
+        )
+        keys_offset = HEADER.size + metadata_length
+        if magic != MAGIC or version != VERSION or len(self._mmap) != keys_offset + count * (PUBKEY_SIZE + 4):
+            self._mmap.close()
+            raise ValueError(f"{index_path} is not a complete public key index of version {VERSION}")
+
+        metadata = json.loads(self._mmap[HEADER.size : keys_offset])
+        self.fingerprint = metadata["fingerprint"]
+        self.file_names: list[str] = metadata["file_names"]
+
+        self.keys = SortedKeys(self._mmap, keys_offset, count)
+        self._file_ids = memoryview(self._mmap)[keys_offset + count * PUBKEY_SIZE :].cast("I")
+
+    @classmethod
+    def open(
+        cls,
+        dir_path: str = path.join(getcwd(), "tmp", "public_keys"),
+        index_path: Optional[str] = None,
+        use_hashes: bool = False,
+    ) -> "PublicKeyIndex":
+        index_path = index_path or path.join(dir_path, INDEX_FILE_NAME)
+        current_fingerprint = fingerprint(dir_path, use_hashes)
+        if path.exists(index_path):
+            try:
+                index = cls(index_path)
+            except ValueError:
+                index = None
+            if index is not None and index.fingerprint == current_fingerprint:
+                return index
+            if index is not None:
+                index.close()
+
+        cls.build(dir_path, index_path, current_fingerprint)
+        return cls(index_path)
+
+    @staticmethod
+    def build(dir_path: str, index_path: str, source_fingerprint: list):
+        file_names = source_files(dir_path)
+        entries = sorted(
+            {
+                (pubkey, file_id)
+                for file_id, file in enumerate(file_names)
+                for pubkey in iter_public_keys_from_file(path.join(dir_path, file))
+            }
+        )
+        metadata = json.dumps({"fingerprint": source_fingerprint, "file_names": file_names}).encode()
+        # keeps the file ids aligned to 4 bytes
+        metadata += b" " * (-(HEADER.size + len(metadata)) % 4)
+
+        # written to a file of its own next to the index and renamed, so concurrent builds don't mix
+        # and readers never map a partial index
+        with tempfile.NamedTemporaryFile(
+            dir=path.dirname(index_path) or ".", prefix=f".{path.basename(index_path)}.", suffix=".part", delete=False
+        ) as f:
+            try:
+                f.write(HEADER.pack(MAGIC, VERSION, len(entries), len(metadata)))
+                f.write(metadata)
+                f.write(b"".join(pubkey for pubkey, _ in entries))
+                f.write(array("I", (file_id for _, file_id in entries)).tobytes())
+            except BaseException:
+                f.close()
+                remove(f.name)
+                raise
+        replace(f.name, index_path)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, pubkey: Union[str, bytes]) -> bool:
+        return self.find(pubkey) is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._file_ids.release()
+        self._mmap.close()
+
+    def find(self, pubkey: Union[str, bytes]) -> Optional[int]:
+        """Position of the first entry of the key in the sorted keys or None"""
+        pubkey = pubkey_to_bytes(pubkey)
+        position = bisect.bisect_left(self.keys, pubkey)
+        if position < len(self.keys) and self.keys[position] == pubkey:
+            return position
+        return None
+
+    def file_name(self, pubkey: Union[str, bytes]) -> Optional[str]:
+        """Name of the first file listing the key, in name order, or None"""
+        file_names = self.file_names_of(pubkey)
+        return file_names[0] if file_names else None
+
+    def file_names_of(self, pubkey: Union[str, bytes]) -> list[str]:
+        position = self.find(pubkey)
+        if position is None:
+            return []
+
+        pubkey = self.keys[position]
+        file_names = []
+        while position < len(self.keys) and self.keys[position] == pubkey:
+            file_names.append(self.file_names[self._file_ids[position]])
+            position += 1
+        return file_names
+
+    def is_type(self, pubkey: Union[str, bytes], type: str) -> bool:
+        """Whether a file starting with `type` lists the key, the same matching load_public_keys_from_files does"""
+        return any(file_name.startswith(type) for file_name in self.file_names_of(pubkey))
@@ -0,0 +1,142 @@
+import asyncio
+import functools
+import inspect
+import re
+import struct
+import threading
+import time
+from os import makedirs, path
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+BucketState = Tuple[float, float]
+
+
+def rate_limit_key(url: str) -> str:
+    """Requests are limited per host, e.g. "http://node:5052/eth/v1/node/syncing" counts towards "node:5052" """
+    return urlsplit(url).netloc or url
+
+
+class MemoryBucketStore:
+    """Keeps the buckets in this process, shared by all clients using the same RateLimiter"""
+
+    clock = staticmethod(time.monotonic)
+    # updates only hold a thread lock for a few operations
+    blocking = False
+
+    def __init__(self):
+        self._states: Dict[str, BucketState] = {}
+        self._lock = threading.Lock()
+
+    def update(self, key: str, fn: Callable[[Optional[BucketState]], Tuple[BucketState, float]]) -> float:
+        with self._lock:
+            self._states[key], result = fn(self._states.get(key))
+            return result
+
+
+class FileBucketStore:
+    """
+    Keeps every bucket in a small file under `directory`, updated under an exclusive flock,
+    so all processes of a host pointing at the same directory share one quota
+    """
+
+    BUCKET_STRUCT = struct.Struct("<dd")
+    # wall clock, monotonic clocks aren't guaranteed to be comparable across processes
+    clock = staticmethod(time.time)
+    # updates wait for the flock and do file I/O, so async callers run them off the event loop
+    blocking = True
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        makedirs(directory, exist_ok=True)
+
+    def update(self, key: str, fn: Callable[[Optional[BucketState]], Tuple[BucketState, float]]) -> float:
+        import fcntl
+
+        file_path = path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]", "_", key) + ".bucket")
+        with open(file_path, "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read(self.BUCKET_STRUCT.size)
+                state = self.BUCKET_STRUCT.unpack(raw) if len(raw) == self.BUCKET_STRUCT.size else None
+                new_state, result = fn(state)
+                f.seek(0)
+                f.truncate()
+                f.write(self.BUCKET_STRUCT.pack(*new_state))
+                f.flush()
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class RateLimiter:
+    """
+    Token bucket limiter of outgoing requests per host: `rate` requests per second with bursts of up to `burst`.
+    `host_limits` overrides (rate, burst) for specific hosts. Callers reserve a token and sleep until it's theirs,
+    so waiting callers are served in order and the limiter never busy-polls.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[int] = None,
+        host_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        store: MemoryBucketStore or FileBucketStore or None = None,
+    ):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.host_limits = host_limits or {}
+        self.store = store or MemoryBucketStore()
+
+    def reserve(self, key: str) -> float:
+        """
+        Takes a token for `key` and returns how many seconds to wait before using it
+        """
+        rate, burst = self.host_limits.get(key, (self.rate, self.burst))
+
+        def take(state: Optional[BucketState]) -> Tuple[BucketState, float]:
+            now = self.store.clock()
+            tokens, updated_at = state if state is not None else (burst, now)
+            # tokens go negative while callers wait for their reservations
+            tokens = min(burst, tokens + max(0.0, now - updated_at) * rate) - 1
+            return (tokens, now), (0.0 if tokens >= 0 else -tokens / rate)
+
+        return self.store.update(key, take)
+
+    async def acquire(self, key: str):
+        if self.store.blocking:
+            delay = await asyncio.get_running_loop().run_in_executor(None, self.reserve, key)
+        else:
+            delay = self.reserve(key)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self, key: str):
+        delay = self.reserve(key)
+        if delay > 0:
+            time.sleep(delay)
+
+    def limit(self, key: str):
+        """
+        Decorator acquiring a token for `key` before every call of a sync or async function
+        """
+
+        def decorator(f):
+            if inspect.iscoroutinefunction(f):
+
+                @functools.wraps(f)
+                async def limited(*args, **kwargs):
+                    await self.acquire(key)
+                    return await f(*args, **kwargs)
+
+            else:
+
+                @functools.wraps(f)
+                def limited(*args, **kwargs):
+                    self.acquire_blocking(key)
+                    return f(*args, **kwargs)
+
+            return limited
+
+        return decorator
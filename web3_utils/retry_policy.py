@@ -0,0 +1,328 @@
+import functools
+import inspect
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from tenacity import (
+    AsyncRetrying,
+    DoAttempt,
+    DoSleep,
+    RetryCallState,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_any,
+    stop_never,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the endpoint while its circuit breaker is open"""
+
+
+def get_retry_after(e: BaseException) -> Optional[float]:
+    """
+    Reads the Retry-After header, in seconds or as an HTTP date, from aiohttp and requests errors
+    """
+    headers = getattr(e, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(e, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _failed_retry_state(retrying: Retrying, f: Callable, args: tuple, kwargs: dict, started_at: float) -> RetryCallState:
+    """Retry state of a first attempt that raised the exception being handled"""
+    retrying.begin()
+    retry_state = RetryCallState(retry_object=retrying, fn=f, args=args, kwargs=kwargs)
+    retry_state.start_time = started_at
+    retry_state.set_exception(sys.exc_info())
+    return retry_state
+
+
+def retry_after_failure(f: Callable, **retry_kwargs) -> Callable:
+    """
+    Same as tenacity's retry decorator, except that the first attempt calls `f` directly
+    and the retry state is only set up once it raised. `before` isn't called for the first attempt.
+    """
+    if inspect.iscoroutinefunction(f):
+        async_retrying = AsyncRetrying(**retry_kwargs)
+
+        @functools.wraps(f)
+        async def retried(*args, **kwargs):
+            started_at = time.monotonic()
+            try:
+                return await f(*args, **kwargs)
+            except Exception:
+                retry_state = _failed_retry_state(async_retrying, f, args, kwargs, started_at)
+
+            while True:
+                do = async_retrying.iter(retry_state=retry_state)
+                if isinstance(do, DoAttempt):
+                    try:
+                        result = await f(*args, **kwargs)
+                    except BaseException:
+                        retry_state.set_exception(sys.exc_info())
+                    else:
+                        retry_state.set_result(result)
+                elif isinstance(do, DoSleep):
+                    retry_state.prepare_for_next_attempt()
+                    await async_retrying.sleep(do)
+                else:
+                    return do
+
+        retried.retry = async_retrying
+        return retried
+
+    retrying = Retrying(**retry_kwargs)
+
+    @functools.wraps(f)
+    def retried(*args, **kwargs):
+        started_at = time.monotonic()
+        try:
+            return f(*args, **kwargs)
+        except Exception:
+            retry_state = _failed_retry_state(retrying, f, args, kwargs, started_at)
+
+        while True:
+            do = retrying.iter(retry_state=retry_state)
+            if isinstance(do, DoAttempt):
+                try:
+                    result = f(*args, **kwargs)
+                except BaseException:
+                    retry_state.set_exception(sys.exc_info())
+                else:
+                    retry_state.set_result(result)
+            elif isinstance(do, DoSleep):
+                retry_state.prepare_for_next_attempt()
+                retrying.sleep(do)
+            else:
+                return do
+
+    retried.retry = retrying
+    return retried
+
+
+class RetryBudget:
+    """
+    Token bucket of retries: holds up to `capacity` retries and earns them back at `capacity / window` per second
+    """
+
+    def __init__(self, capacity: int, window: float):
+        self.capacity = capacity
+        self.refill_rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+            self.updated_at = now
+            if self.tokens < 1:
+                return False
+
+            self.tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for `reset_timeout` seconds,
+    then lets a single trial call through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def before_call(self, key: str):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if self._trial_in_flight or time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Circuit for {key} is open after {self.failures} consecutive failures")
+
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self):
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class RetryPolicy:
+    """
+    Retry configuration shared by the beacon and execution layer clients.
+
+    Waits grow exponentially from `initial_wait` up to `max_wait` with full jitter, so clients
+    rate limited together don't retry together. A Retry-After header sent with the error takes precedence,
+    capped at `max_retry_after`. Optionally, retries stop after `max_attempts`, every endpoint gets
+    a budget of `retry_budget` retries per `retry_budget_window` seconds, and endpoints failing
+    `failure_threshold` times in a row are short-circuited with CircuitOpenError for `reset_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        initial_wait: float = 1.0,
+        max_wait: float = 30.0,
+        max_retry_after: float = 120.0,
+        max_attempts: Optional[int] = None,
+        retry_budget: Optional[int] = None,
+        retry_budget_window: float = 60.0,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: float = 30.0,
+    ):
+        self.initial_wait = initial_wait
+        self.max_wait = max_wait
+        self.max_retry_after = max_retry_after
+        self.max_attempts = max_attempts
+        self.retry_budget = retry_budget
+        self.retry_budget_window = retry_budget_window
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, retry_state: RetryCallState) -> float:
+        if retry_state.outcome is not None and retry_state.outcome.failed:
+            retry_after = get_retry_after(retry_state.outcome.exception())
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+
+        return random.uniform(0, min(self.max_wait, self.initial_wait * 2 ** (retry_state.attempt_number - 1)))
+
+    def budget(self, key: str) -> Optional[RetryBudget]:
+        if self.retry_budget is None:
+            return None
+
+        with self._lock:
+            if key not in self._budgets:
+                self._budgets[key] = RetryBudget(self.retry_budget, self.retry_budget_window)
+            return self._budgets[key]
+
+    def circuit_breaker(self, key: str) -> Optional[CircuitBreaker]:
+        if self.failure_threshold is None:
+            return None
+
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[key]
+
+    def stop(self, key: str, retry_stop: Callable or None = None):
+        stops = []
+        if retry_stop:
+            stops.append(retry_stop())
+        if self.max_attempts is not None:
+            stops.append(stop_after_attempt(self.max_attempts))
+
+        budget = self.budget(key)
+        if budget is not None:
+            # evaluated last, so a token is only spent when the retry is going to happen
+            stops.append(lambda retry_state: not budget.try_withdraw())
+
+        return stop_any(*stops) if stops else stop_never
+
+    def retrying(
+        self,
+        key: str,
+        is_retryable: Callable[[BaseException], bool],
+        retry_stop: Callable or None = None,
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+        **retry_kwargs,
+    ):
+        """
+        Returns a decorator retrying sync or async functions under this policy for the `key` endpoint.
+        `is_failure` decides which errors count towards the circuit breaker, retryable errors by default.
+        """
+        breaker = self.circuit_breaker(key)
+        retry_kwargs = dict(retry=retry_if_exception(is_retryable), stop=self.stop(key, retry_stop), wait=self.wait, **retry_kwargs)
+        if breaker is None:
+            return lambda f: retry_after_failure(f, **retry_kwargs)
+
+        is_failure = is_failure or is_retryable
+
+        def decorator(f):
+            if inspect.iscoroutinefunction(f):
+
+                @functools.wraps(f)
+                async def guarded(*args, **kwargs):
+                    breaker.before_call(key)
+                    try:
+                        result = await f(*args, **kwargs)
+                    except Exception as e:
+                        if is_failure(e):
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                        raise
+                    except BaseException:
+                        breaker.release()
+                        raise
+                    breaker.record_success()
+                    return result
+
+            else:
+
+                @functools.wraps(f)
+                def guarded(*args, **kwargs):
+                    breaker.before_call(key)
+                    try:
+                        result = f(*args, **kwargs)
+                    except Exception as e:
+                        if is_failure(e):
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                        raise
+                    except BaseException:
+                        breaker.release()
+                        raise
+                    breaker.record_success()
+                    return result
+
+            return retry_after_failure(guarded, **retry_kwargs)
+
+        return decorator
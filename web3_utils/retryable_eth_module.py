@@ -8,11 +8,16 @@ from typing import Type
 import typing
 from aiohttp import ClientConnectorError
 from requests import HTTPError, ConnectionError
-from tenacity import retry, retry_if_exception_type, wait_fixed, RetryCallState, retry_any, retry_if_exception, stop_never
+from tenacity import RetryCallState
 from tenacity._utils import get_callback_name
 from web3.eth import Eth, AsyncEth
 from web3.exceptions import TransactionNotFound, BlockNotFound
 
+from web3_utils.block_cache import BlockCache
+from web3_utils.json_rpc_batch import AsyncJsonRpcBatch, BatchEntriesFailed, JsonRpcBatch
+from web3_utils.rate_limiter import RateLimiter, rate_limit_key
+from web3_utils.retry_policy import RetryPolicy
+
 
 def before_sleep_log(
     logger: "logging.Logger",
@@ -65,29 +70,109 @@ def is_timeout_value_error(e) -> bool:
     return isinstance(e, ValueError) and "request failed or timed out" in str(e)
 
 
-def get_retryable_eth_module(base: Type[Eth] | Type[AsyncEth], logger: logging.Logger, retry_stop: typing.Callable or None = None):
+def is_retryable_eth_error(e) -> bool:
+    return (
+        isinstance(e, (BlockNotFound, TransactionNotFound, ConnectionError, ClientConnectorError, asyncio.TimeoutError))
+        or is_retryable_http_error(e)
+        or is_timeout_value_error(e)
+    )
+
+
+def is_provider_failure(e) -> bool:
+    """Missing blocks and transactions are retried while they propagate, but don't mean the provider is unhealthy"""
+    return not isinstance(e, (BlockNotFound, TransactionNotFound)) and is_retryable_eth_error(e)
+
+
+def rpc_method_name(method) -> str:
+    json_rpc_method = getattr(method, "json_rpc_method", None)
+    return json_rpc_method if isinstance(json_rpc_method, str) else getattr(json_rpc_method, "__name__", "eth")
+
+
+def get_retryable_eth_module(
+    base: Type[Eth] | Type[AsyncEth],
+    logger: logging.Logger,
+    retry_stop: typing.Callable or None = None,
+    retry_policy: RetryPolicy | None = None,
+    rate_limiter: RateLimiter | None = None,
+    block_cache: BlockCache | None = None,
+):
+    """
+    Returns `base` with retries under `retry_policy` and optional rate limiting.
+    `block_cache` caches blocks, receipts and logs of AsyncEth modules.
+    """
+    if block_cache is not None and not issubclass(base, AsyncEth):
+        raise ValueError("block_cache is only supported by AsyncEth modules")
+
+    retry_policy = retry_policy or RetryPolicy()
+
     class RetryableModule(base):
-        def __getattribute__(self, name):
+        def __init__(self, w3):
+            super().__init__(w3)
+            self._retrieve_caller_fn = self.retrieve_caller_fn
+            self._retryable_callers = {}
+            self._before_sleep = before_sleep_log(logger=logger, log_level=logging.WARNING)
+            self.retrieve_caller_fn = self._retrieve_retryable_caller_fn
+
+        def _retrieve_retryable_caller_fn(self, method):
             """
-            "retrieve_caller_fn" returns a function which raises errors based on RPC results.
-            We can also catch HTTPErrors and ConnectionErrors here
+            web3 retrieves the caller, a function which raises errors based on RPC results, on every method access.
+            Callers are wrapped once per method with retries for HTTPErrors and ConnectionErrors and reused afterwards.
             """
-            if name == "retrieve_caller_fn":
-                return lambda *args, **kargs: retry(
-                    retry=retry_any(
-                        retry_if_exception_type(
-                            (BlockNotFound, TransactionNotFound, ConnectionError, ClientConnectorError, asyncio.TimeoutError)
-                        ),
-                        retry_if_exception(is_retryable_http_error),
-                        retry_if_exception(is_timeout_value_error),
-                    ),
-                    wait=wait_fixed(5),
+            caller = self._retryable_callers.get(method)
+            if caller is None:
+                caller = self._retryable_callers[method] = retry_policy.retrying(
+                    rpc_method_name(method),
+                    is_retryable_eth_error,
+                    retry_stop=retry_stop,
+                    is_failure=is_provider_failure,
                     reraise=True,
                     before=before,
-                    before_sleep=before_sleep_log(logger=logger, log_level=logging.WARNING),
-                    stop=retry_stop() if retry_stop else stop_never,
-                )(object.__getattribute__(self, name)(*args, *kargs))
-            else:
-                return object.__getattribute__(self, name)
+                    before_sleep=self._before_sleep,
+                )(self._rate_limited(self._retrieve_caller_fn(method)))
+            return caller
+
+        def batch(self, batch_size: int = 100) -> JsonRpcBatch | AsyncJsonRpcBatch:
+            """
+            Collects calls with `batch.add("get_block", 123)` and sends them as JSON-RPC batches on `batch.execute()`.
+            Entries failing with retryable errors are resent under the module's retry policy, the others are kept.
+            """
+            batch_class = AsyncJsonRpcBatch if self.is_async else JsonRpcBatch
+            return batch_class(
+                self,
+                batch_size=batch_size,
+                retrying=retry_policy.retrying(
+                    "batch",
+                    lambda e: isinstance(e, BatchEntriesFailed) or is_retryable_eth_error(e),
+                    retry_stop=retry_stop,
+                    is_failure=lambda e: is_provider_failure(e)
+                    or (isinstance(e, BatchEntriesFailed) and any(is_provider_failure(error) for error in e.errors)),
+                    reraise=True,
+                    before=before,
+                    before_sleep=self._before_sleep,
+                ),
+                is_retryable=is_retryable_eth_error,
+                rate_limited=self._rate_limited,
+            )
+
+        def _rate_limited(self, caller):
+            """Every attempt, retries included, takes a token from the provider host's bucket"""
+            if rate_limiter is None:
+                return caller
+
+            endpoint_uri = getattr(self.w3.provider, "endpoint_uri", None) or self.w3.provider.__class__.__name__
+            return rate_limiter.limit(rate_limit_key(str(endpoint_uri)))(caller)
+
+    if block_cache is None:
+        return RetryableModule
+
+    class BlockCachedModule(RetryableModule):
+        async def get_block(self, block_identifier, full_transactions: bool = False):
+            return await block_cache.get_block(super().get_block, block_identifier, full_transactions)
+
+        async def get_transaction_receipt(self, transaction_hash):
+            return await block_cache.get_transaction_receipt(super().get_transaction_receipt, transaction_hash)
+
+        async def get_logs(self, filter_params):
+            return await block_cache.get_logs(super().get_logs, filter_params)
 
-    return RetryableModule
+    return BlockCachedModule
@@ -1,4 +1,9 @@
+from typing import Iterable, List, Union
+
 from eth_typing import HexStr
+from eth_utils import remove_0x_prefix
+
+from web3_utils.validator_table import PUBKEY_SIZE
 
 PUBKEY_LENGTH = 96
 
@@ -7,5 +12,35 @@ def split_validator_pubkey_bytes(pubkeys: HexStr):
     """
     Splits batchDeposit pubkey bytes into individual pubkeys
     """
-    pubkeys_raw = pubkeys.replace("0x", "")
+    pubkeys_raw = remove_0x_prefix(pubkeys)
     return ["0x" + pubkeys_raw[idx : idx + PUBKEY_LENGTH] for idx in range(0, len(pubkeys_raw), PUBKEY_LENGTH)]
+
+
+def validator_pubkeys_view(pubkeys: Union[HexStr, bytes, bytearray, memoryview]) -> memoryview:
+    """
+    Byte view of concatenated pubkeys, bytes and memoryviews are not copied and hex is decoded once
+    """
+    if isinstance(pubkeys, str):
+        pubkeys = bytes.fromhex(remove_0x_prefix(pubkeys))
+
+    view = memoryview(pubkeys).cast("B")
+    if len(view) % PUBKEY_SIZE != 0:
+        raise ValueError(f"Pubkey bytes must be a multiple of {PUBKEY_SIZE} bytes, got {len(view)}")
+    return view
+
+
+def split_validator_pubkey_views(pubkeys: Union[HexStr, bytes, bytearray, memoryview]) -> List[memoryview]:
+    """
+    Zero-copy split_validator_pubkey_bytes: 48-byte memoryviews into the batchDeposit pubkey bytes
+    """
+    view = validator_pubkeys_view(pubkeys)
+    return [view[offset : offset + PUBKEY_SIZE] for offset in range(0, len(view), PUBKEY_SIZE)]
+
+
+def validator_pubkeys_to_hex(pubkeys: Union[bytes, memoryview, Iterable[Union[bytes, memoryview]]]) -> List[str]:
+    """
+    0x-prefixed pubkeys from concatenated pubkey bytes or split pubkeys, hex encoded in one pass
+    """
+    view = validator_pubkeys_view(pubkeys if isinstance(pubkeys, (bytes, bytearray, memoryview)) else b"".join(pubkeys))
+    encoded = view.hex()
+    return ["0x" + encoded[idx : idx + PUBKEY_LENGTH] for idx in range(0, len(encoded), PUBKEY_LENGTH)]
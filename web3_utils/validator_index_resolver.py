@@ -0,0 +1,96 @@
+import struct
+from os import makedirs, path, getcwd
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from web3_utils.async_beacon import AsyncBeacon
+from web3_utils.validator_table import PUBKEY_SIZE, pubkey_to_bytes
+
+# pubkey, validator index
+MAPPING_RECORD = struct.Struct(f"<{PUBKEY_SIZE}sQ")
+
+
+class ValidatorIndexResolver:
+    """
+    Resolves pubkeys to validator indexes through a map kept in an append-only file of 56-byte records,
+    so the beacon node is only asked, in batches of `batch_size`, about keys that were never resolved.
+    Indexes are resolved at `state_id`, finalized by default, because an index seen at head can still be reorged.
+    get_validators and get_validator_balances then query by the short numeric indexes instead of pubkeys.
+    """
+
+    def __init__(
+        self,
+        beacon: AsyncBeacon,
+        file_path: str = path.join(getcwd(), "tmp", "validator_indexes.bin"),
+        batch_size: int = 1000,
+        state_id: str = "finalized",
+    ):
+        self.beacon = beacon
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self.state_id = state_id
+        self.indexes: Dict[bytes, int] = {}
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def get(self, pubkey: Union[str, bytes]) -> Optional[int]:
+        return self.indexes.get(pubkey_to_bytes(pubkey))
+
+    async def resolve(self, pubkeys: Iterable[Union[str, bytes]]) -> Dict[str, int]:
+        """
+        Returns the indexes of `pubkeys` by 0x-prefixed pubkey, keys without a validator yet are left out
+        """
+        raw_pubkeys = [pubkey_to_bytes(pubkey) for pubkey in pubkeys]
+        unresolved = list(dict.fromkeys(pubkey for pubkey in raw_pubkeys if pubkey not in self.indexes))
+        if unresolved:
+            response = await self.beacon.get_validators(
+                self.state_id, ids=["0x" + pubkey.hex() for pubkey in unresolved], batch_size=self.batch_size
+            )
+            self._store(
+                {pubkey_to_bytes(validator["validator"]["pubkey"]): int(validator["index"]) for validator in response["data"]}
+            )
+
+        return {"0x" + pubkey.hex(): self.indexes[pubkey] for pubkey in raw_pubkeys if pubkey in self.indexes}
+
+    async def resolve_indexes(self, pubkeys: Iterable[Union[str, bytes]]) -> List[str]:
+        return [str(index) for index in (await self.resolve(pubkeys)).values()]
+
+    async def get_validators(
+        self, pubkeys: Iterable[Union[str, bytes]], state_id: str = "head", statuses: List[str] = None
+    ) -> Dict[str, Any]:
+        indexes = await self.resolve_indexes(pubkeys)
+        if not indexes:
+            return {"data": []}
+        return await self.beacon.get_validators(state_id, ids=indexes, statuses=statuses, batch_size=self.batch_size)
+
+    async def get_validator_balances(self, pubkeys: Iterable[Union[str, bytes]], state_id: str = "head") -> Dict[str, Any]:
+        indexes = await self.resolve_indexes(pubkeys)
+        if not indexes:
+            return {"data": []}
+        return await self.beacon.get_validator_balances(state_id, indexes=indexes, batch_size=self.batch_size)
+
+    def _load(self):
+        if not path.exists(self.file_path):
+            return
+
+        with open(self.file_path, "rb") as f:
+            data = f.read()
+
+        # a record cut short by a crash while appending is dropped and overwritten by the next append
+        complete_size = len(data) - len(data) % MAPPING_RECORD.size
+        for pubkey, index in MAPPING_RECORD.iter_unpack(memoryview(data)[:complete_size]):
+            self.indexes[pubkey] = index
+        if complete_size != len(data):
+            with open(self.file_path, "r+b") as f:
+                f.truncate(complete_size)
+
+    def _store(self, indexes: Dict[bytes, int]):
+        new_indexes = {pubkey: index for pubkey, index in indexes.items() if self.indexes.get(pubkey) != index}
+        if not new_indexes:
+            return
+
+        makedirs(path.dirname(self.file_path) or ".", exist_ok=True)
+        with open(self.file_path, "ab") as f:
+            f.write(b"".join(MAPPING_RECORD.pack(pubkey, index) for pubkey, index in new_indexes.items()))
+        self.indexes.update(new_indexes)
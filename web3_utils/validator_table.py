@@ -0,0 +1,218 @@
+from array import array
+from operator import sub
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from eth_utils import remove_0x_prefix
+
+PUBKEY_SIZE = 48
+FAR_FUTURE_EPOCH = 2**64 - 1
+VALIDATOR_STATUSES = (
+    "pending_initialized",
+    "pending_queued",
+    "active_ongoing",
+    "active_exiting",
+    "active_slashed",
+    "exited_unslashed",
+    "exited_slashed",
+    "withdrawal_possible",
+    "withdrawal_done",
+)
+STATUS_CODES = {status: code for code, status in enumerate(VALIDATOR_STATUSES)}
+
+EMPTY_SLOT = -1
+INDEX_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+class ValidatorRecord(NamedTuple):
+    index: int
+    pubkey: bytes
+    balance: int
+    effective_balance: int
+    status: str
+    slashed: bool
+    activation_eligibility_epoch: int
+    activation_epoch: int
+    exit_epoch: int
+    withdrawable_epoch: int
+
+
+def pubkey_to_bytes(pubkey: Union[str, bytes]) -> bytes:
+    if isinstance(pubkey, str):
+        pubkey = bytes.fromhex(remove_0x_prefix(pubkey))
+    if len(pubkey) != PUBKEY_SIZE:
+        raise ValueError(f"Validator pubkey must be {PUBKEY_SIZE} bytes, got {len(pubkey)}")
+
+    return pubkey
+
+
+class ValidatorTable:
+    """
+    Column store for validator sets: one array per field and all pubkeys in a single bytes buffer.
+    Rows are found by index or pubkey through open addressing hash tables of row numbers, which is
+    a few bytes per validator instead of a dict entry plus key object.
+    """
+
+    def __init__(self):
+        self.index = array("Q")
+        self.balance = array("Q")
+        self.effective_balance = array("Q")
+        self.status = array("B")
+        self.slashed = array("B")
+        self.activation_eligibility_epoch = array("Q")
+        self.activation_epoch = array("Q")
+        self.exit_epoch = array("Q")
+        self.withdrawable_epoch = array("Q")
+        self.pubkeys = bytearray()
+        self._index_slots = array("i", [EMPTY_SLOT]) * 8
+        self._pubkey_slots = array("i", [EMPTY_SLOT]) * 8
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @classmethod
+    def from_validators(cls, validators: Iterable[Dict[str, Any]]) -> "ValidatorTable":
+        """
+        Accepts the "data" items of get_validators, also straight from iter_validators
+        """
+        table = cls()
+        for validator in validators:
+            table.append(validator)
+
+        return table
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any]) -> "ValidatorTable":
+        return cls.from_validators(response["data"])
+
+    def append(self, validator: Dict[str, Any]):
+        details = validator["validator"]
+        index = int(validator["index"])
+        pubkey = pubkey_to_bytes(details["pubkey"])
+
+        if self.row_of_index(index) is not None or self._pubkey_slots[self._find_pubkey_slot(pubkey)] != EMPTY_SLOT:
+            raise ValueError(f"Validator {index} is already in the table")
+
+        self.index.append(index)
+        self.balance.append(int(validator["balance"]))
+        self.effective_balance.append(int(details["effective_balance"]))
+        self.status.append(STATUS_CODES[validator["status"]])
+        self.slashed.append(bool(details["slashed"]))
+        self.activation_eligibility_epoch.append(int(details["activation_eligibility_epoch"]))
+        self.activation_epoch.append(int(details["activation_epoch"]))
+        self.exit_epoch.append(int(details["exit_epoch"]))
+        self.withdrawable_epoch.append(int(details["withdrawable_epoch"]))
+        self.pubkeys += pubkey
+
+        row = len(self.index) - 1
+        if 2 * len(self.index) > len(self._index_slots):
+            self._rebuild_slots(4 * len(self._index_slots))
+        else:
+            self._index_slots[self._find_index_slot(index)] = row
+            self._pubkey_slots[self._find_pubkey_slot(pubkey)] = row
+
+    def update_balances(self, balances: Iterable[Dict[str, Any]]):
+        """
+        Applies the "data" items of get_validator_balances
+        """
+        for item in balances:
+            row = self.row_of_index(int(item["index"]))
+            if row is None:
+                raise KeyError(f"Validator {item['index']} is not in the table")
+            self.balance[row] = int(item["balance"])
+
+    def row_of_index(self, index: int) -> Optional[int]:
+        row = self._index_slots[self._find_index_slot(index)]
+        return None if row == EMPTY_SLOT else row
+
+    def row_of_pubkey(self, pubkey: Union[str, bytes]) -> Optional[int]:
+        row = self._pubkey_slots[self._find_pubkey_slot(pubkey_to_bytes(pubkey))]
+        return None if row == EMPTY_SLOT else row
+
+    def pubkey(self, row: int) -> bytes:
+        return bytes(self.pubkeys[row * PUBKEY_SIZE : (row + 1) * PUBKEY_SIZE])
+
+    def record(self, row: int) -> ValidatorRecord:
+        return ValidatorRecord(
+            index=self.index[row],
+            pubkey=self.pubkey(row),
+            balance=self.balance[row],
+            effective_balance=self.effective_balance[row],
+            status=VALIDATOR_STATUSES[self.status[row]],
+            slashed=bool(self.slashed[row]),
+            activation_eligibility_epoch=self.activation_eligibility_epoch[row],
+            activation_epoch=self.activation_epoch[row],
+            exit_epoch=self.exit_epoch[row],
+            withdrawable_epoch=self.withdrawable_epoch[row],
+        )
+
+    def get_by_index(self, index: int) -> Optional[ValidatorRecord]:
+        row = self.row_of_index(index)
+        return None if row is None else self.record(row)
+
+    def get_by_pubkey(self, pubkey: Union[str, bytes]) -> Optional[ValidatorRecord]:
+        row = self.row_of_pubkey(pubkey)
+        return None if row is None else self.record(row)
+
+    def total_balance(self, statuses: Optional[List[str]] = None) -> int:
+        if statuses is None:
+            return sum(self.balance)
+
+        totals = self.total_balance_by_status()
+        return sum(totals[status] for status in statuses)
+
+    def total_balance_by_status(self) -> Dict[str, int]:
+        totals = [0] * len(VALIDATOR_STATUSES)
+        for status, balance in zip(self.status, self.balance):
+            totals[status] += balance
+
+        return dict(zip(VALIDATOR_STATUSES, totals))
+
+    def count_by_status(self) -> Dict[str, int]:
+        counts = [0] * len(VALIDATOR_STATUSES)
+        for status in self.status:
+            counts[status] += 1
+
+        return dict(zip(VALIDATOR_STATUSES, counts))
+
+    def diff_balances(self, previous: "ValidatorTable") -> Tuple[array, array]:
+        """
+        Returns the indexes present in both tables and their balance change since `previous`.
+        Tables built from the same ordered validator set are diffed column against column.
+        """
+        common = min(len(self), len(previous))
+        if self.index[:common] == previous.index[:common]:
+            return self.index[:common], array("q", map(sub, self.balance, previous.balance))
+
+        indexes, deltas = array("Q"), array("q")
+        for row, index in enumerate(self.index):
+            previous_row = previous.row_of_index(index)
+            if previous_row is not None:
+                indexes.append(index)
+                deltas.append(self.balance[row] - previous.balance[previous_row])
+
+        return indexes, deltas
+
+    def _find_index_slot(self, index: int) -> int:
+        slots = self._index_slots
+        mask = len(slots) - 1
+        slot = ((index * INDEX_HASH_MULTIPLIER) >> 16) & mask
+        while slots[slot] != EMPTY_SLOT and self.index[slots[slot]] != index:
+            slot = (slot + 1) & mask
+
+        return slot
+
+    def _find_pubkey_slot(self, pubkey: bytes) -> int:
+        slots = self._pubkey_slots
+        mask = len(slots) - 1
+        slot = hash(pubkey) & mask
+        while slots[slot] != EMPTY_SLOT and self.pubkey(slots[slot]) != pubkey:
+            slot = (slot + 1) & mask
+
+        return slot
+
+    def _rebuild_slots(self, size: int):
+        self._index_slots = array("i", [EMPTY_SLOT]) * size
+        self._pubkey_slots = array("i", [EMPTY_SLOT]) * size
+        for row, index in enumerate(self.index):
+            self._index_slots[self._find_index_slot(index)] = row
+            self._pubkey_slots[self._find_pubkey_slot(self.pubkey(row))] = row